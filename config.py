@@ -1,44 +1,75 @@
 """Загрузка конфигурации из переменных окружения."""
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Загрузка переменных окружения из .env файла
-load_dotenv()
+# Загрузка переменных окружения из .env файла — только если окружение ещё
+# не заполнено снаружи (Docker/systemd) и файл действительно существует,
+# чтобы не сканировать файловую систему на каждом старте
+_ENV_PATH = Path(os.getenv("DOTENV_PATH", ".env"))
+if not os.environ.get("TELEGRAM_BOT_TOKEN") and _ENV_PATH.is_file():
+    load_dotenv(_ENV_PATH, override=False)
 
 
-class Config:
-    """Класс для хранения конфигурации приложения."""
-    
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Неизменяемая конфигурация приложения, заполняется один раз при импорте."""
+
     # Telegram Bot Configuration
-    TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
-    
+    TELEGRAM_BOT_TOKEN: str
+
     # AI API Configuration
-    AI_API_URL: str = os.getenv("AI_API_URL", "")
-    AI_API_KEY: str = os.getenv("AI_API_KEY", "")
-    AI_MODEL: str = os.getenv("AI_MODEL", "gpt-4o")
-    
+    AI_API_URL: str
+    AI_API_KEY: str
+    AI_MODEL: str
+
     # Logging Configuration
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG")
-    
+    LOG_LEVEL: str
+
     # Temporary Files Path
-    TEMP_FILE_PATH: Path = Path(os.getenv("TEMP_FILE_PATH", "./temp_files"))
-    
+    TEMP_FILE_PATH: Path
+
     # API Request Timeout (seconds)
-    API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "180"))
-    
-    @classmethod
-    def validate(cls) -> bool:
+    API_TIMEOUT: int
+
+    def validate(self) -> bool:
         """Проверка наличия обязательных параметров конфигурации."""
-        if not cls.TELEGRAM_BOT_TOKEN:
+        if not self.TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN не установлен в переменных окружения")
-        if not cls.AI_API_URL:
+        if not self.AI_API_URL:
             raise ValueError("AI_API_URL не установлен в переменных окружения")
         return True
-    
-    @classmethod
-    def ensure_temp_dir(cls) -> None:
-        """Создание директории для временных файлов, если её нет."""
-        cls.TEMP_FILE_PATH.mkdir(parents=True, exist_ok=True)
 
+    def ensure_temp_dir(self) -> None:
+        """Создание директории для временных файлов, если её нет.
+
+        Директория создается один раз за время жизни процесса, повторные
+        вызовы не обращаются к файловой системе.
+        """
+        global _TEMP_DIR_READY
+        if not _TEMP_DIR_READY:
+            self.TEMP_FILE_PATH.mkdir(parents=True, exist_ok=True)
+            _TEMP_DIR_READY = True
+
+
+# Флаг однократного создания директории временных файлов
+_TEMP_DIR_READY = False
+
+
+# Единственный экземпляр конфигурации: все значения читаются из окружения
+# один раз, дальше — только быстрые обращения к атрибутам
+CONFIG = _Config(
+    TELEGRAM_BOT_TOKEN=os.getenv("TELEGRAM_BOT_TOKEN", ""),
+    AI_API_URL=os.getenv("AI_API_URL", ""),
+    AI_API_KEY=os.getenv("AI_API_KEY", ""),
+    AI_MODEL=os.getenv("AI_MODEL", "gpt-4o"),
+    LOG_LEVEL=os.getenv("LOG_LEVEL", "DEBUG"),
+    TEMP_FILE_PATH=Path(os.getenv("TEMP_FILE_PATH", "./temp_files")),
+    API_TIMEOUT=int(os.getenv("API_TIMEOUT", "180")),
+)
+
+# Существующий код обращается к конфигурации через имя Config —
+# сохраняем его как ссылку на тот же экземпляр
+Config = CONFIG
@@ -1,19 +1,76 @@
 """Обработчик загрузки и обработки файлов от пользователей."""
 
+import asyncio
+import string
+import time
+import uuid
+from bisect import bisect_right
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from config import Config
 from logger import get_logger
-from processors.excel_reader import extract_project_data
-from processors.ai_client import analyze_risks_with_fallback
-from processors.report_generator import create_risk_analysis_sheet
 from utils.cleanup import remove_file, cleanup_old_files
 
 logger = get_logger("file_handler")
 
+# Максимальный размер файла для обработки целиком в памяти (10 МБ)
+_IN_MEMORY_LIMIT = 10 * 1024 * 1024
+
+# Уровни оценки бизнеса: (минимальный балл, эмодзи, уровень, пояснение)
+_SCORE_TIERS: Tuple[Tuple[int, str, str, str], ...] = (
+    (80, "🟢", "Отличный", "Проект демонстрирует высокую инвестиционную привлекательность с отличными финансовыми показателями и низкими рисками."),
+    (60, "🟡", "Хороший", "Проект имеет хорошие перспективы, но требует внимательного мониторинга ключевых рисков."),
+    (40, "🟠", "Удовлетворительный", "Проект имеет среднюю привлекательность и требует дополнительных мер по снижению рисков."),
+    (0, "🔴", "Требует внимания", "Проект имеет высокие риски и требует серьезной доработки финансовой модели."),
+)
+
+# Шаблон блока общей оценки в сообщении пользователю
+_SCORE_BLOCK_TEMPLATE = "{emoji} **Общая оценка:** {score}/100 ({level})\n_{explanation}_\n\n"
+
+# Шаблон всего сообщения с оценкой бизнеса; опциональные блоки подставляются
+# пустыми строками, если соответствующих данных нет
+_VISION_TEMPLATE = string.Template(
+    "📊 **Оценка бизнеса:**\n\n"
+    "$score_block"
+    "**Ключевые показатели:**\n"
+    "• NPV: $npv млн руб\n"
+    "• IRR: $irr%\n"
+    "• Срок окупаемости: $payback лет\n\n"
+    "$vision_block"
+    "$extra_payback_block"
+    "📄 Подробный анализ доступен в прикрепленном файле."
+)
+
+# Флаг выполняющейся фоновой очистки, чтобы не плодить параллельные задачи
+_cleanup_running = False
+
+# Минимальный интервал между фоновыми очистками (секунды): сканировать
+# директорию на каждой загрузке нет смысла, очистка — best-effort
+_CLEANUP_INTERVAL = 60.0
+_last_cleanup = 0.0
+
+
+def _schedule_cleanup() -> None:
+    """Запуск фоновой очистки старых файлов, если она еще не идет и не запускалась недавно."""
+    global _cleanup_running, _last_cleanup
+    now = time.monotonic()
+    if _cleanup_running or now - _last_cleanup < _CLEANUP_INTERVAL:
+        return
+    _cleanup_running = True
+    _last_cleanup = now
+
+    async def _run() -> None:
+        global _cleanup_running
+        try:
+            await asyncio.to_thread(cleanup_old_files, 5)
+        finally:
+            _cleanup_running = False
+
+    asyncio.create_task(_run())
+
 
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -23,6 +80,12 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         update: Объект обновления Telegram
         context: Контекст бота
     """
+    # Ленивая загрузка обработчиков данных: openpyxl и requests тяжелые,
+    # откладываем их импорт до первого реально присланного файла
+    from processors.excel_reader import extract_project_data, extract_project_data_from_bytes
+    from processors.ai_client import analyze_risks_with_fallback_async
+    from processors.report_generator import create_risk_analysis_sheet_async
+
     user = update.effective_user
     user_id = user.id if user else None
     document = update.message.document if update.message else None
@@ -44,8 +107,9 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     output_file_path: Optional[Path] = None
     
     try:
-        # Валидация расширения файла
-        if not file_name.lower().endswith('.xlsx'):
+        # Валидация расширения файла (дублирует фильтр диспетчера в main.py,
+        # оставлена как защита на случай другой регистрации обработчика)
+        if Path(file_name).suffix.casefold() != '.xlsx':
             error_msg = "Ошибка: поддерживаются только файлы Excel с расширением .xlsx"
             logger.warning(f"Неверное расширение файла: {file_name}")
             await update.message.reply_text(error_msg)
@@ -58,14 +122,28 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         bot = context.bot
         file = await bot.get_file(file_id)
         
-        temp_file_path = Config.TEMP_FILE_PATH / file_name
-        await file.download_to_drive(temp_file_path)
-        
-        logger.info(f"Файл сохранен: {temp_file_path.name} (размер: {temp_file_path.stat().st_size} байт)")
-        
+        # Уникальный префикс: два пользователя могут одновременно прислать
+        # файлы с одинаковыми именами, перезаписывать их друг другом нельзя
+        temp_file_path = Config.TEMP_FILE_PATH / f"{uuid.uuid4().hex[:8]}_{file_name}"
+
+        # Небольшие файлы скачиваем в память, чтобы не блокировать event loop
+        # записью на диск; копия на диске все равно нужна генератору отчета
+        file_bytes: Optional[bytes] = None
+        if document.file_size and document.file_size <= _IN_MEMORY_LIMIT:
+            file_bytes = bytes(await file.download_as_bytearray())
+            await asyncio.to_thread(temp_file_path.write_bytes, file_bytes)
+        else:
+            await file.download_to_drive(temp_file_path)
+
+        # Размер уже известен из метаданных Telegram — stat() не нужен
+        logger.info(f"Файл сохранен: {temp_file_path.name} (размер: {document.file_size} байт)")
+
         # Извлечение данных из Excel
         try:
-            project_data = extract_project_data(temp_file_path)
+            if file_bytes is not None:
+                project_data = extract_project_data_from_bytes(file_bytes, file_name=file_name)
+            else:
+                project_data = extract_project_data(temp_file_path)
             logger.info("Данные успешно извлечены из файла")
         except ValueError as e:
             error_msg = str(e)
@@ -74,7 +152,7 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return
         except Exception as e:
             error_msg = "Ошибка: не удалось прочитать файл. Убедитесь, что файл не поврежден."
-            logger.error(f"Ошибка чтения файла: {e}", exc_info=True)
+            logger.error(f"Ошибка чтения файла: {e!r}")
             await update.message.reply_text(error_msg)
             return
         
@@ -100,18 +178,18 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         # Анализ рисков через ИИ-сервис
         try:
             logger.info("Отправка запроса к API ИИ-сервиса")
-            risk_analysis = analyze_risks_with_fallback(project_params, model_results)
+            risk_analysis = await analyze_risks_with_fallback_async(project_params, model_results)
             logger.info(f"Анализ рисков завершен. Уровень риска: {risk_analysis.get('risk_level', 'Не определен')}")
         except Exception as e:
             error_msg = "Ошибка API: сервис анализа временно недоступен."
-            logger.error(f"Ошибка при обращении к API: {e}", exc_info=True)
+            logger.error(f"Ошибка при обращении к API: {e!r}")
             await update.message.reply_text(error_msg)
             return
         
         # Генерация отчета
         try:
             logger.info("Создание отчета анализа рисков")
-            output_file_path = create_risk_analysis_sheet(
+            output_file_path = await create_risk_analysis_sheet_async(
                 temp_file_path,
                 project_params,
                 model_results,
@@ -127,12 +205,14 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         # Отправка результата пользователю
         try:
             logger.info(f"Отправка файла пользователю {user_id}")
-            with open(output_file_path, 'rb') as report_file:
-                await update.message.reply_document(
-                    document=report_file,
-                    filename=output_file_path.name,
-                    caption="✅ Анализ рисков завершен. Файл с результатами готов."
-                )
+            # Передаем путь — библиотека сама отправит файл порциями,
+            # не загружая его целиком в память заранее.
+            # Пользователю отдаем имя без служебного uuid-префикса
+            await update.message.reply_document(
+                document=output_file_path,
+                filename=f"{Path(file_name).stem}_анализ.xlsx",
+                caption="✅ Анализ рисков завершен. Файл с результатами готов."
+            )
             logger.info("Файл успешно отправлен пользователю")
             
             # Отправка дополнительного сообщения с видением и оценкой
@@ -148,98 +228,108 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     # Используем базовый срок окупаемости из модели, если estimated_payback не указан
                     display_payback = estimated_payback if estimated_payback is not None else model_results.get("payback_period")
                     
-                    vision_message = "📊 **Оценка бизнеса:**\n\n"
-                    
+                    # Опциональные блоки собираются отдельно, а само сообщение
+                    # рендерится одной подстановкой в заготовленный шаблон
+                    score_block = ""
                     if business_score is not None:
-                        # Определяем уровень оценки
-                        if business_score >= 80:
-                            score_emoji = "🟢"
-                            score_level = "Отличный"
-                            score_explanation = "Проект демонстрирует высокую инвестиционную привлекательность с отличными финансовыми показателями и низкими рисками."
-                        elif business_score >= 60:
-                            score_emoji = "🟡"
-                            score_level = "Хороший"
-                            score_explanation = "Проект имеет хорошие перспективы, но требует внимательного мониторинга ключевых рисков."
-                        elif business_score >= 40:
-                            score_emoji = "🟠"
-                            score_level = "Удовлетворительный"
-                            score_explanation = "Проект имеет среднюю привлекательность и требует дополнительных мер по снижению рисков."
-                        else:
-                            score_emoji = "🔴"
-                            score_level = "Требует внимания"
-                            score_explanation = "Проект имеет высокие риски и требует серьезной доработки финансовой модели."
-                        
-                        vision_message += f"{score_emoji} **Общая оценка:** {business_score}/100 ({score_level})\n"
-                        vision_message += f"_{score_explanation}_\n\n"
-                    
-                    # Добавляем ключевые показатели для контекста
-                    vision_message += "**Ключевые показатели:**\n"
-                    vision_message += f"• NPV: {model_results.get('npv', 0):.2f} млн руб\n"
-                    vision_message += f"• IRR: {model_results.get('irr', 0):.2f}%\n"
-                    vision_message += f"• Срок окупаемости: {model_results.get('payback_period', 0):.2f} лет\n\n"
-                    
-                    if business_vision:
-                        vision_message += f"💡 **Видение бизнеса:**\n{business_vision}\n\n"
-                    
+                        # Определяем уровень оценки по таблице уровней
+                        score_emoji, score_level, score_explanation = next(
+                            (tier[1:] for tier in _SCORE_TIERS if business_score >= tier[0]),
+                            _SCORE_TIERS[-1][1:]
+                        )
+                        score_block = _SCORE_BLOCK_TEMPLATE.format(
+                            emoji=score_emoji,
+                            score=business_score,
+                            level=score_level,
+                            explanation=score_explanation
+                        )
+
+                    vision_block = f"💡 **Видение бизнеса:**\n{business_vision}\n\n" if business_vision else ""
+
+                    extra_payback_block = ""
                     if display_payback is not None:
                         if estimated_payback is not None and estimated_payback != model_results.get('payback_period'):
-                            vision_message += f"⏱️ **Примерная окупаемость (с учетом перспектив):** {display_payback:.2f} лет\n\n"
-                    
-                    vision_message += "📄 Подробный анализ доступен в прикрепленном файле."
-                    
+                            extra_payback_block = f"⏱️ **Примерная окупаемость (с учетом перспектив):** {display_payback:.2f} лет\n\n"
+
+                    vision_message = _VISION_TEMPLATE.substitute(
+                        score_block=score_block,
+                        npv=f"{model_results.get('npv', 0):.2f}",
+                        irr=f"{model_results.get('irr', 0):.2f}",
+                        payback=f"{model_results.get('payback_period', 0):.2f}",
+                        vision_block=vision_block,
+                        extra_payback_block=extra_payback_block
+                    )
+
                     # Разбиваем длинные сообщения (лимит Telegram - 4096 символов)
                     max_length = 4000
                     if len(vision_message) > max_length:
-                        # Отправляем первую часть
-                        first_part = vision_message[:max_length]
-                        last_newline = first_part.rfind('\n')
+                        # Собираем позиции переносов строк и ищем точку разрыва
+                        # бинарным поиском вместо обратного скана
+                        newline_offsets = []
+                        pos = vision_message.find('\n')
+                        while pos != -1:
+                            newline_offsets.append(pos)
+                            pos = vision_message.find('\n', pos + 1)
+
+                        split_idx = bisect_right(newline_offsets, max_length - 1) - 1
+                        last_newline = newline_offsets[split_idx] if split_idx >= 0 else -1
                         if last_newline > max_length * 0.8:  # Если есть разумное место для разрыва
                             first_part = vision_message[:last_newline]
                             second_part = vision_message[last_newline+1:]
                         else:
+                            first_part = vision_message[:max_length]
                             second_part = vision_message[max_length:]
                         
-                        await update.message.reply_text(first_part, parse_mode='Markdown')
                         if second_part.strip():
-                            await update.message.reply_text(second_part, parse_mode='Markdown')
+                            # Части — один текст, разрезанный посередине, поэтому
+                            # порядок доставки важен: вторая часть отправляется
+                            # ответом на первую, а не параллельно через gather
+                            first_msg = await update.message.reply_text(first_part, parse_mode='Markdown')
+                            await update.message.reply_text(
+                                second_part,
+                                parse_mode='Markdown',
+                                reply_to_message_id=first_msg.message_id
+                            )
+                        else:
+                            await update.message.reply_text(first_part, parse_mode='Markdown')
                         logger.info("Дополнительное сообщение с видением отправлено (разбито на части)")
                     else:
                         # Отправляем с Markdown форматированием
                         await update.message.reply_text(vision_message, parse_mode='Markdown')
                         logger.info("Дополнительное сообщение с видением отправлено")
                 except Exception as e:
-                    logger.error(f"Ошибка при отправке дополнительного сообщения: {e}", exc_info=True)
+                    logger.error(f"Ошибка при отправке дополнительного сообщения: {e!r}")
             else:
                 logger.warning("Нет данных для дополнительного сообщения (business_vision, business_score, estimated_payback)")
                 
         except Exception as e:
             error_msg = "Ошибка отправки файла. Попробуйте позже."
-            logger.error(f"Ошибка отправки файла: {e}", exc_info=True)
+            logger.error(f"Ошибка отправки файла: {e!r}")
             await update.message.reply_text(error_msg)
             return
         
         # Очистка временных файлов
         logger.info("Очистка временных файлов")
         if temp_file_path:
-            remove_file(temp_file_path)
+            await asyncio.to_thread(remove_file, temp_file_path)
         if output_file_path:
             # Оставляем выходной файл на некоторое время, затем удаляем
             # В реальном сценарии можно оставить его для пользователя
             pass
-        
-        # Периодическая очистка старых файлов
-        cleanup_old_files(max_age_minutes=5)
-        
+
+        # Периодическая очистка старых файлов — в фоне, чтобы не задерживать ответ
+        _schedule_cleanup()
+
         logger.info(f"Обработка файла завершена успешно для пользователя {user_id}")
-        
+
     except Exception as e:
         error_msg = "Ошибка обработки: произошла непредвиденная ошибка."
         logger.error(f"Критическая ошибка при обработке файла: {e}", exc_info=True)
         await update.message.reply_text(error_msg)
-        
+
         # Очистка в случае ошибки
         if temp_file_path:
-            remove_file(temp_file_path)
+            await asyncio.to_thread(remove_file, temp_file_path)
         if output_file_path:
-            remove_file(output_file_path)
+            await asyncio.to_thread(remove_file, output_file_path)
 
@@ -2,66 +2,76 @@
 
 import logging
 import sys
-from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 from config import Config
 
+# Корень иерархии логгеров приложения — единственный логгер с обработчиком
+_ROOT_LOGGER_NAME = "RiskAnalyzerBot"
+
 
 class CustomFormatter(logging.Formatter):
     """Кастомный форматтер для логов."""
-    
+
+    def __init__(self) -> None:
+        # Нативное форматирование времени через %(asctime)s заметно дешевле,
+        # чем создание datetime на каждую запись
+        super().__init__(
+            fmt="[%(asctime)s] [%(levelname)s] [%(module)s] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
     def format(self, record: logging.LogRecord) -> str:
-        """Форматирование записи лога."""
-        # Получение UserID из extra, если есть
+        """Форматирование записи лога с добавлением UserID, если есть."""
+        log_message = super().format(record)
         user_id = getattr(record, 'user_id', None)
-        user_info = f" (UserID: {user_id})" if user_id else ""
-        
-        # Форматирование времени
-        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Форматирование сообщения
-        log_message = (
-            f"[{timestamp}] "
-            f"[{record.levelname}] "
-            f"[{record.module}] - "
-            f"{record.getMessage()}"
-            f"{user_info}"
-        )
+        if user_id:
+            log_message = f"{log_message} (UserID: {user_id})"
         return log_message
 
 
+@lru_cache(maxsize=128)
 def setup_logger(name: str = "RiskAnalyzerBot", user_id: Optional[int] = None) -> logging.Logger:
     """
     Настройка и возврат логгера.
-    
+
+    Повторные вызовы с теми же аргументами возвращают закэшированный логгер,
+    не пересоздавая обработчики.
+
     Args:
         name: Имя логгера
         user_id: ID пользователя Telegram (опционально)
-    
+
     Returns:
         Настроенный логгер
     """
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper(), logging.DEBUG))
-    
-    # Удаление существующих обработчиков
-    logger.handlers.clear()
-    
-    # Создание обработчика для консоли
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    
-    # Применение кастомного форматтера
-    formatter = CustomFormatter()
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
+
+    if name == _ROOT_LOGGER_NAME:
+        # Обработчик ставится только на корневой логгер приложения —
+        # и настраивается один раз, повторная установка привела бы к утечке
+        if not getattr(logger, "_configured", False):
+            logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper(), logging.DEBUG))
+
+            # Создание обработчика для консоли
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(logging.DEBUG)
+
+            # Применение кастомного форматтера
+            console_handler.setFormatter(CustomFormatter())
+
+            logger.addHandler(console_handler)
+            logger._configured = True
+    else:
+        # Дочерние логгеры наследуют обработчик и уровень корневого
+        # через propagate — каждая запись форматируется ровно один раз
+        setup_logger(_ROOT_LOGGER_NAME)
+
     # Добавление user_id в контекст логгера
     if user_id:
         logger = logging.LoggerAdapter(logger, {"user_id": user_id})
-    
+
     return logger
 
 
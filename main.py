@@ -29,17 +29,28 @@ def main() -> None:
         if deleted > 0:
             logger.info(f"Удалено {deleted} устаревших файлов")
         
-        # Создание приложения бота
+        # Создание приложения бота с параллельной обработкой обновлений:
+        # handle_document подолгу ждет скачивание и ответ ИИ-сервиса,
+        # последовательная обработка выстроила бы пользователей в очередь
         logger.info("Инициализация Telegram бота...")
-        application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
-        
+        application = (
+            Application.builder()
+            .token(Config.TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(True)
+            .build()
+        )
+
         # Регистрация обработчиков команд
         application.add_handler(CommandHandler("start", start_command))
         application.add_handler(CommandHandler("help", help_command))
-        
+
         # Регистрация обработчика документов (Excel файлы)
         application.add_handler(
-            MessageHandler(filters.Document.ALL & filters.Document.FileExtension("xlsx"), handle_document)
+            MessageHandler(
+                filters.Document.ALL & filters.Document.FileExtension("xlsx"),
+                handle_document,
+                block=False
+            )
         )
         
         # Регистрация обработчика текстовых сообщений
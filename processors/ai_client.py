@@ -1,43 +1,132 @@
 """Клиент для взаимодействия с API ИИ-сервиса анализа рисков."""
 
+import asyncio
+import copy
 import json
 import hashlib
-from typing import Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
+from urllib3.util.retry import Retry
 
 from config import Config
 from logger import get_logger
 from processors.risk_calculator import calculate_risk_fallback
 
+# orjson заметно быстрее стандартного json на многокилобайтных телах запросов
+# и ответах модели; при его отсутствии прозрачно работаем через stdlib
+try:
+    import orjson
+
+    def _json_dumps(obj: Dict) -> bytes:
+        return orjson.dumps(obj)
+
+    def _json_dumps_sorted(obj: Dict) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Dict) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _json_dumps_sorted(obj: Dict) -> str:
+        return json.dumps(obj, sort_keys=True)
+
+    _json_loads = json.loads
+
 logger = get_logger("ai_client")
 
+# Переиспользуемая HTTP-сессия: держит TCP/TLS соединения открытыми между
+# запросами и повторяет запрос при временных ошибках сервера
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["POST"],
+        raise_on_status=False
+    )
+))
+_SESSION.headers.update({
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    # CORS заголовок для запроса (если API требует)
+    "Origin": "RiskAnalyzerBot"
+})
+# Добавление API ключа, если указан
+if Config.AI_API_KEY:
+    _SESSION.headers["Authorization"] = f"Bearer {Config.AI_API_KEY}"
 
-def create_ai_prompt(project_params: Dict, model_results: Dict) -> str:
+# Кэш результатов анализа по нормализованным входным данным: повторная
+# загрузка того же файла не должна оплачивать новый вызов ИИ-сервиса
+_RESULT_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+_RESULT_CACHE_MAX = 256
+
+# Значения по умолчанию для необязательных полей ответа API
+_RESULT_DEFAULTS = {
+    "scenarios": [],
+    "total_potential_losses": 0,
+    "risk_mitigation": [],
+    "business_vision": "",
+    "estimated_payback": None,
+    "business_score": None,
+}
+
+# Общий асинхронный HTTP-клиент, создается лениво при первом использовании
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _cache_key(project_params: Dict, model_results: Dict) -> str:
     """
-    Создание промпта для ИИ-сервиса на основе данных проекта.
-    
+    Ключ кэша: JSON-строка нормализованных входных данных.
+
+    Та же строка служит источником seed для детерминированных ответов API.
+
     Args:
         project_params: Параметры проекта
         model_results: Результаты финансовой модели
-    
+
     Returns:
-        Текст промпта для ИИ
+        Канонизированная JSON-строка входных данных
     """
-    prompt = f"""Ты - эксперт по анализу рисков инфраструктурных инвестиционных проектов. Проанализируй представленные данные финансовой модели проекта и оцени уровень рисков, включая анализ различных непредвиденных ситуаций.
+    # Нормализация данных для стабильности (округление до 2 знаков)
+    normalized = {
+        "capex": round(float(project_params.get('capex', 0)), 2),
+        "construction_years": round(float(project_params.get('construction_years', 0)), 2),
+        "debt_share": round(float(project_params.get('debt_share', 0)), 2),
+        "debt_rate": round(float(project_params.get('debt_rate', 0)), 2),
+        "discount_rate": round(float(project_params.get('discount_rate', 0)), 2),
+        "npv": round(float(model_results.get('npv', 0)), 2),
+        "irr": round(float(model_results.get('irr', 0)), 2),
+        "payback_period": round(float(model_results.get('payback_period', 0)), 2),
+        "type": str(project_params.get('type', 'Не указан'))
+    }
+    return _json_dumps_sorted(normalized)
+
+
+# Шаблон промпта собирается один раз при импорте; фигурные скобки JSON-примера
+# экранированы удвоением, значения подставляются через format_map
+_PROMPT_TEMPLATE = """Ты - эксперт по анализу рисков инфраструктурных инвестиционных проектов. Проанализируй представленные данные финансовой модели проекта и оцени уровень рисков, включая анализ различных непредвиденных ситуаций.
 
 Входные данные проекта:
-- Тип проекта: {project_params.get('type', 'Не указан')}
-- Стоимость строительства (CAPEX): {project_params.get('capex', 0)} млн руб
-- Срок строительства: {project_params.get('construction_years', 0)} лет
-- Доля долга: {project_params.get('debt_share', 0)}%
-- Ставка по долгу: {project_params.get('debt_rate', 0)}%
-- Ставка дисконтирования: {project_params.get('discount_rate', 0)}%
+- Тип проекта: {project_type}
+- Стоимость строительства (CAPEX): {capex} млн руб
+- Срок строительства: {construction_years} лет
+- Доля долга: {debt_share}%
+- Ставка по долгу: {debt_rate}%
+- Ставка дисконтирования: {discount_rate}%
 
 Результаты финансовой модели:
-- NPV (чистая приведенная стоимость): {model_results.get('npv', 0)} млн руб
-- IRR (внутренняя норма доходности): {model_results.get('irr', 0)}%
-- Срок окупаемости: {model_results.get('payback_period', 0)} лет
+- NPV (чистая приведенная стоимость): {npv} млн руб
+- IRR (внутренняя норма доходности): {irr}%
+- Срок окупаемости: {payback_period} лет
 
 Проведи комплексный анализ рисков, учитывая:
 1. Финансовую устойчивость проекта (NPV, IRR, срок окупаемости)
@@ -89,31 +178,73 @@ def create_ai_prompt(project_params: Dict, model_results: Dict) -> str:
 }}
 
 Оценка должна быть объективной и учитывать все представленные параметры. Сценарии должны быть реалистичными и специфичными для данного типа инфраструктурного проекта. Ответ должен быть ТОЛЬКО валидным JSON объектом."""
-    
-    return prompt
 
 
-def analyze_risks(project_params: Dict, model_results: Dict) -> Dict:
+def create_ai_prompt(project_params: Dict, model_results: Dict) -> str:
     """
-    Отправка запроса к API ИИ-сервиса для анализа рисков.
-    
+    Создание промпта для ИИ-сервиса на основе данных проекта.
+
     Args:
         project_params: Параметры проекта
         model_results: Результаты финансовой модели
-    
+
     Returns:
-        Словарь с результатами анализа рисков
-    
-    Raises:
-        RequestException: При ошибках HTTP-запроса
-        ValueError: При невалидном ответе от API
+        Текст промпта для ИИ
+    """
+    return _create_ai_prompt_cached(
+        project_params.get('type', 'Не указан'),
+        project_params.get('capex', 0),
+        project_params.get('construction_years', 0),
+        project_params.get('debt_share', 0),
+        project_params.get('debt_rate', 0),
+        project_params.get('discount_rate', 0),
+        model_results.get('npv', 0),
+        model_results.get('irr', 0),
+        model_results.get('payback_period', 0)
+    )
+
+
+@lru_cache(maxsize=512)
+def _create_ai_prompt_cached(
+    project_type,
+    capex,
+    construction_years,
+    debt_share,
+    debt_rate,
+    discount_rate,
+    npv,
+    irr,
+    payback_period
+) -> str:
+    """Сборка текста промпта; повторные вызовы с теми же данными берутся из кэша."""
+    return _PROMPT_TEMPLATE.format_map({
+        "project_type": project_type,
+        "capex": capex,
+        "construction_years": construction_years,
+        "debt_share": debt_share,
+        "debt_rate": debt_rate,
+        "discount_rate": discount_rate,
+        "npv": npv,
+        "irr": irr,
+        "payback_period": payback_period
+    })
+
+
+def _build_request_body(project_params: Dict, model_results: Dict, data_string: str) -> Dict:
+    """
+    Формирование тела запроса к API в формате OpenAI.
+
+    Args:
+        project_params: Параметры проекта
+        model_results: Результаты финансовой модели
+        data_string: Канонизированная строка входных данных (источник seed)
+
+    Returns:
+        Словарь тела запроса
     """
-    logger.info("Формирование запроса к API ИИ-сервиса")
-    
     # Создание промпта
     prompt = create_ai_prompt(project_params, model_results)
-    
-    # Формирование тела запроса в формате OpenAI API
+
     request_body = {
         "model": Config.AI_MODEL,
         "messages": [
@@ -124,135 +255,155 @@ def analyze_risks(project_params: Dict, model_results: Dict) -> Dict:
         ],
         "response_format": {"type": "json_object"}
     }
-    
+
     logger.debug(f"Отправка запроса к API: {Config.AI_API_URL}")
     logger.debug(f"Упрощенный промпт (первые 200 символов): {prompt[:200]}...")
+
+    # Генерация seed на основе нормализованных данных для стабильности;
+    # blake2b быстрее md5 и сразу дает дайджест нужной длины
+    seed = int(hashlib.blake2b(data_string.encode(), digest_size=4).hexdigest(), 16) % 2147483647
+
+    # Добавление seed для детерминированных результатов
+    request_body["seed"] = seed
+
+    logger.debug(f"Используется seed: {seed} для стабильности результатов")
+
+    return request_body
+
+
+def _process_response(status_code: int, content: bytes, data_string: str) -> Dict:
+    """
+    Разбор и валидация ответа API, кэширование успешного результата.
+
+    Тело принимается сырыми байтами: на успешном пути оно сразу уходит в
+    JSON-парсер, а декодирование в текст (с определением кодировки)
+    выполняется только в ветках ошибок, где текст нужен для сообщений.
+
+    Args:
+        status_code: HTTP-статус ответа
+        content: Сырое тело ответа
+        data_string: Ключ кэша результата
+
+    Returns:
+        Словарь с результатами анализа рисков
+
+    Raises:
+        RequestException: При ошибочном статусе ответа
+        ValueError: При невалидном теле ответа
+    """
+    logger.debug(f"Получен ответ от API: статус {status_code}")
+
+    # Проверка статуса ответа
+    if status_code == 200:
+        try:
+            api_response = _json_loads(content)
+            logger.info("Успешно получен ответ от API ИИ-сервиса")
+
+            # Извлечение JSON из ответа OpenAI API
+            if "choices" in api_response and len(api_response["choices"]) > 0:
+                message_content = api_response["choices"][0]["message"]["content"]
+                # Парсинг JSON из текста ответа
+                result = _json_loads(message_content)
+            elif "risk_level" in api_response:
+                # Прямой ответ уже в нужном формате
+                result = api_response
+            else:
+                raise ValueError("Неожиданный формат ответа от API")
+
+            logger.debug(f"Уровень риска: {result.get('risk_level', 'Не указан')}")
+
+            # Валидация структуры ответа
+            if "risk_level" not in result:
+                logger.warning("Ответ API не содержит обязательное поле 'risk_level'")
+                raise ValueError("Невалидный формат ответа от API: отсутствует поле 'risk_level'")
+
+            # Недостающие необязательные поля добиваются одним слиянием
+            # словарей вместо цепочки проверок принадлежности
+            result = {**_RESULT_DEFAULTS, **result}
+
+            # Сохранение результата в кэш с вытеснением старых записей
+            _RESULT_CACHE[data_string] = copy.deepcopy(result)
+            if len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+                _RESULT_CACHE.popitem(last=False)
+
+            return result
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Ошибка парсинга JSON ответа: {e}")
+            raise ValueError("Невалидный JSON в ответе от API")
+
+    elif status_code == 400:
+        # Обработка ошибок валидации (например, Invalid URL)
+        text = content.decode("utf-8", errors="replace")
+        try:
+            error_data = _json_loads(content)
+            error_message = error_data.get("error", {}).get("message", text)
+        except Exception:
+            error_message = text
+        logger.error(f"Ошибка валидации API (400): {error_message[:500]}")
+        if "Invalid URL" in error_message or "GET" in error_message:
+            logger.error("Обнаружена ошибка с методом запроса. Проверьте URL и метод.")
+        raise RequestException(f"Ошибка API: {error_message[:200]}")
+
+    elif status_code == 500:
+        logger.error("Ошибка сервера API (500)")
+        raise RequestException("Ошибка API: сервис анализа временно недоступен.")
+
+    elif status_code == 503:
+        logger.error("Сервис API недоступен (503)")
+        raise RequestException("Ошибка API: сервис анализа временно недоступен.")
+
+    else:
+        logger.error(f"Неожиданный статус ответа: {status_code}")
+        logger.error(f"Тело ответа: {content.decode('utf-8', errors='replace')[:500]}")
+        raise RequestException(
+            f"Ошибка API: получен статус {status_code}. "
+            "Сервис анализа временно недоступен."
+        )
+
+
+def analyze_risks(project_params: Dict, model_results: Dict) -> Dict:
+    """
+    Отправка запроса к API ИИ-сервиса для анализа рисков.
     
-    # Подготовка заголовков
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-    
-    # Добавление API ключа, если указан
-    if Config.AI_API_KEY:
-        headers["Authorization"] = f"Bearer {Config.AI_API_KEY}"
-        # Или можно использовать другой формат:
-        # headers["X-API-Key"] = Config.AI_API_KEY
+    Args:
+        project_params: Параметры проекта
+        model_results: Результаты финансовой модели
     
-    # CORS заголовки для запроса (если API требует)
-    headers["Origin"] = "RiskAnalyzerBot"
+    Returns:
+        Словарь с результатами анализа рисков
     
+    Raises:
+        RequestException: При ошибках HTTP-запроса
+        ValueError: При невалидном ответе от API
+    """
+    logger.info("Формирование запроса к API ИИ-сервиса")
+
     try:
-        # Нормализация данных для стабильности (округление до 2 знаков)
-        normalized_params = {
-            "capex": round(float(project_params.get('capex', 0)), 2),
-            "construction_years": round(float(project_params.get('construction_years', 0)), 2),
-            "debt_share": round(float(project_params.get('debt_share', 0)), 2),
-            "debt_rate": round(float(project_params.get('debt_rate', 0)), 2),
-            "discount_rate": round(float(project_params.get('discount_rate', 0)), 2)
-        }
-        normalized_results = {
-            "npv": round(float(model_results.get('npv', 0)), 2),
-            "irr": round(float(model_results.get('irr', 0)), 2),
-            "payback_period": round(float(model_results.get('payback_period', 0)), 2)
-        }
-        
-        # Генерация seed на основе нормализованных данных для стабильности
-        data_string = json.dumps({
-            **normalized_params,
-            **normalized_results,
-            "type": str(project_params.get('type', 'Не указан'))
-        }, sort_keys=True)
-        seed = int(hashlib.md5(data_string.encode()).hexdigest()[:8], 16) % 2147483647
-        
-        # Добавление seed для детерминированных результатов
-        request_body["seed"] = seed
-        
-        logger.debug(f"Используется seed: {seed} для стабильности результатов")
-        
-        # Отправка POST запроса
-        response = requests.post(
+        # Ключ кэша по нормализованным данным — при повторной отправке тех же
+        # параметров возвращаем сохраненный результат без обращения к API
+        data_string = _cache_key(project_params, model_results)
+        cached = _RESULT_CACHE.get(data_string)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(data_string)
+            logger.info("Результат анализа найден в кэше, запрос к API пропущен")
+            return copy.deepcopy(cached)
+
+        request_body = _build_request_body(project_params, model_results, data_string)
+
+        # Отправка POST запроса через общую сессию (заголовки уже установлены).
+        # stream=True: тело читается напрямую из сокета одним куском и сразу
+        # отдается парсеру, без промежуточного декодирования в текст
+        with _SESSION.post(
             Config.AI_API_URL,
-            json=request_body,
-            headers=headers,
-            timeout=Config.API_TIMEOUT
-        )
-        
-        logger.debug(f"Получен ответ от API: статус {response.status_code}")
-        
-        # Проверка статуса ответа
-        if response.status_code == 200:
-            try:
-                api_response = response.json()
-                logger.info("Успешно получен ответ от API ИИ-сервиса")
-                
-                # Извлечение JSON из ответа OpenAI API
-                if "choices" in api_response and len(api_response["choices"]) > 0:
-                    content = api_response["choices"][0]["message"]["content"]
-                    # Парсинг JSON из текста ответа
-                    result = json.loads(content)
-                elif "risk_level" in api_response:
-                    # Прямой ответ уже в нужном формате
-                    result = api_response
-                else:
-                    raise ValueError("Неожиданный формат ответа от API")
-                
-                logger.debug(f"Уровень риска: {result.get('risk_level', 'Не указан')}")
-                
-                # Валидация структуры ответа
-                if "risk_level" not in result:
-                    logger.warning("Ответ API не содержит обязательное поле 'risk_level'")
-                    raise ValueError("Невалидный формат ответа от API: отсутствует поле 'risk_level'")
-                
-                # Убеждаемся, что все необходимые поля присутствуют
-                if "scenarios" not in result:
-                    result["scenarios"] = []
-                if "total_potential_losses" not in result:
-                    result["total_potential_losses"] = 0
-                if "risk_mitigation" not in result:
-                    result["risk_mitigation"] = []
-                if "business_vision" not in result:
-                    result["business_vision"] = ""
-                if "estimated_payback" not in result:
-                    result["estimated_payback"] = None
-                if "business_score" not in result:
-                    result["business_score"] = None
-                
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Ошибка парсинга JSON ответа: {e}")
-                raise ValueError("Невалидный JSON в ответе от API")
-        
-        elif response.status_code == 400:
-            # Обработка ошибок валидации (например, Invalid URL)
-            try:
-                error_data = response.json()
-                error_message = error_data.get("error", {}).get("message", response.text)
-            except:
-                error_message = response.text
-            logger.error(f"Ошибка валидации API (400): {error_message[:500]}")
-            if "Invalid URL" in error_message or "GET" in error_message:
-                logger.error("Обнаружена ошибка с методом запроса. Проверьте URL и метод.")
-            raise RequestException(f"Ошибка API: {error_message[:200]}")
-        
-        elif response.status_code == 500:
-            logger.error("Ошибка сервера API (500)")
-            raise RequestException("Ошибка API: сервис анализа временно недоступен.")
-        
-        elif response.status_code == 503:
-            logger.error("Сервис API недоступен (503)")
-            raise RequestException("Ошибка API: сервис анализа временно недоступен.")
-        
-        else:
-            logger.error(f"Неожиданный статус ответа: {response.status_code}")
-            logger.error(f"Тело ответа: {response.text[:500]}")
-            raise RequestException(
-                f"Ошибка API: получен статус {response.status_code}. "
-                "Сервис анализа временно недоступен."
-            )
-    
+            data=_json_dumps(request_body),
+            timeout=Config.API_TIMEOUT,
+            stream=True
+        ) as response:
+            raw_body = response.raw.read(decode_content=True)
+
+        return _process_response(response.status_code, raw_body, data_string)
+
     except Timeout:
         logger.error(f"Превышено время ожидания ответа от API ({Config.API_TIMEOUT} сек)")
         raise RequestException("Ошибка обработки: превышено время ожидания.")
@@ -266,14 +417,93 @@ def analyze_risks(project_params: Dict, model_results: Dict) -> Dict:
         raise RequestException("Ошибка API: произошла непредвиденная ошибка.")
 
 
+def _get_async_client() -> httpx.AsyncClient:
+    """Ленивая инициализация общего асинхронного HTTP-клиента."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Origin": "RiskAnalyzerBot",
+                **({"Authorization": f"Bearer {Config.AI_API_KEY}"} if Config.AI_API_KEY else {})
+            },
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=Config.API_TIMEOUT
+        )
+    return _ASYNC_CLIENT
+
+
+async def analyze_risks_async(project_params: Dict, model_results: Dict) -> Dict:
+    """
+    Асинхронный вариант analyze_risks для параллельной обработки.
+
+    Args:
+        project_params: Параметры проекта
+        model_results: Результаты финансовой модели
+
+    Returns:
+        Словарь с результатами анализа рисков
+
+    Raises:
+        RequestException: При ошибках HTTP-запроса
+        ValueError: При невалидном ответе от API
+    """
+    logger.info("Формирование асинхронного запроса к API ИИ-сервиса")
+
+    try:
+        data_string = _cache_key(project_params, model_results)
+        cached = _RESULT_CACHE.get(data_string)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(data_string)
+            logger.info("Результат анализа найден в кэше, запрос к API пропущен")
+            return copy.deepcopy(cached)
+
+        request_body = _build_request_body(project_params, model_results, data_string)
+
+        response = await _get_async_client().post(
+            Config.AI_API_URL,
+            content=_json_dumps(request_body)
+        )
+
+        return _process_response(response.status_code, response.content, data_string)
+
+    except httpx.TimeoutException:
+        logger.error(f"Превышено время ожидания ответа от API ({Config.API_TIMEOUT} сек)")
+        raise RequestException("Ошибка обработки: превышено время ожидания.")
+
+    except RequestException as e:
+        logger.error(f"Ошибка HTTP-запроса к API: {e}", exc_info=True)
+        raise RequestException("Ошибка API: сервис анализа временно недоступен.")
+
+    except Exception as e:
+        logger.error(f"Неожиданная ошибка при обращении к API: {e}", exc_info=True)
+        raise RequestException("Ошибка API: произошла непредвиденная ошибка.")
+
+
+async def analyze_risks_many(projects: List[Tuple[Dict, Dict]]) -> List[Dict]:
+    """
+    Параллельный анализ рисков для нескольких проектов.
+
+    Args:
+        projects: Список пар (параметры проекта, результаты модели)
+
+    Returns:
+        Список результатов анализа в исходном порядке
+    """
+    return await asyncio.gather(
+        *(analyze_risks_async(params, results) for params, results in projects)
+    )
+
+
 def analyze_risks_with_fallback(project_params: Dict, model_results: Dict) -> Dict:
     """
     Анализ рисков с использованием fallback механизма при недоступности API.
-    
+
     Args:
         project_params: Параметры проекта
         model_results: Результаты финансовой модели
-    
+
     Returns:
         Словарь с результатами анализа рисков
     """
@@ -281,7 +511,29 @@ def analyze_risks_with_fallback(project_params: Dict, model_results: Dict) -> Di
         return analyze_risks(project_params, model_results)
     except Exception as e:
         logger.warning(f"API недоступен, используется fallback механизм: {e}")
-        
+
+        # Объединение данных для fallback расчета
+        all_data = {**project_params, **model_results}
+        return calculate_risk_fallback(all_data)
+
+
+async def analyze_risks_with_fallback_async(project_params: Dict, model_results: Dict) -> Dict:
+    """
+    Асинхронный вариант analyze_risks_with_fallback: запрос к API не
+    блокирует event loop, при недоступности API — тот же fallback расчет.
+
+    Args:
+        project_params: Параметры проекта
+        model_results: Результаты финансовой модели
+
+    Returns:
+        Словарь с результатами анализа рисков
+    """
+    try:
+        return await analyze_risks_async(project_params, model_results)
+    except Exception as e:
+        logger.warning(f"API недоступен, используется fallback механизм: {e}")
+
         # Объединение данных для fallback расчета
         all_data = {**project_params, **model_results}
         return calculate_risk_fallback(all_data)
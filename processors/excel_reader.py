@@ -1,55 +1,344 @@
 """Модуль для извлечения данных из Excel файлов."""
 
+import re
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import openpyxl
 from openpyxl import load_workbook
 
+try:
+    # Опциональный Rust-бэкенд: парсит .xlsx в разы быстрее openpyxl
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    # Опциональный автомат Ахо-Корасик: поиск всех шаблонов за один
+    # проход по тексту ячейки вместо перебора шаблонов по очереди
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from logger import get_logger
 
 logger = get_logger("excel_reader")
 
+# Предкомпилированный шаблон для извлечения чисел из текста ячеек
+_NUM_RE = re.compile(r'-?\d+(?:\.\d+)?')
+# Таблица для нормализации строк: запятая -> точка, знак процента убирается
+# (str.translate за один проход вместо цепочки .replace)
+_TBL = str.maketrans({',': '.', '%': ''})
+
+# Шаблоны поиска числовых параметров проекта (текст ищется без учета регистра)
+_SEARCH_PATTERNS = {
+    "capex": ["стоимость строительства", "capex", "капитальные затраты", "инвестиции"],
+    "construction_years": ["срок строительства", "период строительства", "длительность строительства"],
+    "debt_share": ["доля долга", "процент долга", "доля заемных средств"],
+    "debt_rate": ["ставка по долгу", "ставка долга", "процент по долгу", "ставка займа", "процент долга"],
+    "discount_rate": ["ставка дисконтирования", "дисконт", "ставка дисконта", "ставка дисконтирования для бизнеса"],
+    "npv": ["npv", "чистая приведенная стоимость", "чистая приведённая стоимость", "чистый приведенный доход", "чистая приведённая стоимость, млн. руб", "чистая приведённая стоимость, млн руб"],
+    "irr": ["irr", "внутренняя норма доходности", "внутренняя норма рентабельности"],
+    "payback_period": ["срок окупаемости", "период окупаемости", "окупаемость", "payback", "окупаемость, лет"]
+}
+
+_ALL_PATTERNS = [pattern for patterns in _SEARCH_PATTERNS.values() for pattern in patterns]
+
+# Известная форма шаблона финансовой модели: подписи результатов в столбце D,
+# значения в столбце E, якорь — IRR в D15/E15 (см. особый случай ниже).
+# Формат: ключ -> (подпись, ячейка подписи, ячейка значения). Подпись
+# проверяется перед чтением значения, поэтому на файлах другой формы
+# быстрый путь просто не срабатывает и работает обычный поиск по шаблонам.
+_TEMPLATE_CELLS = {
+    "npv": ("npv", (14, 4), (14, 5)),
+    "irr": ("irr", (15, 4), (15, 5)),
+    "payback_period": ("окупаемост", (16, 4), (16, 5)),
+}
 
-def find_cell_by_text(worksheet, search_text: str, case_sensitive: bool = False) -> Optional[Tuple[int, int]]:
+if ahocorasick is not None:
+    # Автомат строится один раз при загрузке модуля: все алиасы известны заранее
+    _AC_AUTOMATON = ahocorasick.Automaton()
+    for _pattern in set(_ALL_PATTERNS):
+        _AC_AUTOMATON.add_word(_pattern, _pattern)
+    _AC_AUTOMATON.make_automaton()
+else:
+    _AC_AUTOMATON = None
+
+
+def _index_sheet(worksheet) -> Tuple[List[Tuple[str, int, int]], Dict[Tuple[int, int], object]]:
     """
-    Поиск ячейки по тексту в первом листе.
-    
+    Однопроходная индексация листа.
+
+    Лист обходится ровно один раз; дальнейшие поиски по тексту и выборки
+    значений по координатам работают по построенным структурам, а не по
+    повторным сканированиям листа.
+
     Args:
         worksheet: Рабочий лист openpyxl
+
+    Returns:
+        Кортеж (текстовый индекс, значения по координатам):
+        текстовый индекс — список (текст в нижнем регистре, строка, столбец),
+        значения — словарь {(строка, столбец): значение ячейки}
+    """
+    text_index: List[Tuple[str, int, int]] = []
+    cells: Dict[Tuple[int, int], object] = {}
+
+    # values_only: openpyxl отдает плоские кортежи значений, не создавая
+    # объект Cell на каждую ячейку; координаты ведем через enumerate
+    for row_num, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+        for col_num, value in enumerate(row, start=1):
+            if value is None:
+                continue
+            cells[(row_num, col_num)] = value
+            if value:
+                text_index.append((str(value).lower(), row_num, col_num))
+
+    return text_index, cells
+
+
+def _load_sheets_calamine(file_path):
+    """
+    Чтение листов файла через python-calamine.
+
+    Файл открывается сразу (ошибки формата всплывают здесь и позволяют
+    откатиться на openpyxl), но сами листы декодируются лениво — при
+    досрочном выходе из обхода оставшиеся листы не разбираются вовсе.
+
+    Args:
+        file_path: Путь к Excel файлу или файлоподобный объект (BytesIO)
+
+    Returns:
+        Кортеж (имена листов, итератор (имя, текстовый индекс, значения))
+    """
+    if isinstance(file_path, Path):
+        workbook = CalamineWorkbook.from_path(str(file_path))
+    else:
+        workbook = CalamineWorkbook.from_filelike(file_path)
+
+    sheet_names = list(workbook.sheet_names)
+
+    def iter_sheets():
+        for sheet_name in sheet_names:
+            # skip_empty_area=False: пустая верхняя область не обрезается,
+            # иначе координаты ячеек съезжают относительно openpyxl
+            rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+            yield sheet_name, *_index_rows(rows)
+
+    return sheet_names, iter_sheets()
+
+
+def _index_rows(rows: List[List]) -> Tuple[List[Tuple[str, int, int]], Dict[Tuple[int, int], object]]:
+    """
+    Построение текстового индекса и словаря значений из 2D-списка строк.
+
+    Для прямоугольных листов поиск непустых ячеек и приведение к нижнему
+    регистру выполняются через numpy (C-циклы по object-массиву вместо
+    питоновского обхода каждой ячейки); для «рваных» строк остается
+    обычный цикл.
+
+    Args:
+        rows: Строки листа как списки значений (формат calamine)
+
+    Returns:
+        Кортеж (текстовый индекс, значения по координатам), как у _index_sheet
+    """
+    text_index: List[Tuple[str, int, int]] = []
+    cells: Dict[Tuple[int, int], object] = {}
+
+    if rows and len({len(row) for row in rows}) == 1 and rows[0]:
+        arr = np.array(rows, dtype=object)
+        mask = (arr != None) & (arr != "")  # noqa: E711 — поэлементное сравнение
+        row_idx, col_idx = np.nonzero(mask)
+        values = arr[mask]
+        lowered = np.char.lower(values.astype(str))
+        # Координаты приводим к 1-базным, как у openpyxl
+        for value, text, row_num, col_num in zip(values, lowered, row_idx + 1, col_idx + 1):
+            coord = (int(row_num), int(col_num))
+            cells[coord] = value
+            if value:
+                text_index.append((str(text), *coord))
+        return text_index, cells
+
+    for row_num, row in enumerate(rows, start=1):
+        for col_num, value in enumerate(row, start=1):
+            if value is None or value == "":
+                continue
+            cells[(row_num, col_num)] = value
+            if value:
+                text_index.append((str(value).lower(), row_num, col_num))
+
+    return text_index, cells
+
+
+def _load_sheets_openpyxl(file_path):
+    """
+    Чтение листов файла через openpyxl (потоковый режим read_only).
+
+    Листы индексируются лениво — при досрочном выходе из обхода оставшиеся
+    листы не читаются.
+
+    Args:
+        file_path: Путь к Excel файлу или файлоподобный объект (BytesIO)
+
+    Returns:
+        Кортеж (имена листов, итератор (имя, текстовый индекс, значения))
+    """
+    # read_only: потоковое чтение без построения полной модели листа в памяти;
+    # весь доступ к ячейкам идет через один проход iter_rows в _index_sheet
+    workbook = load_workbook(file_path, data_only=True, read_only=True)
+    sheet_names = list(workbook.sheetnames)
+
+    def iter_sheets():
+        try:
+            for sheet_name in sheet_names:
+                text_index, cells = _index_sheet(workbook[sheet_name])
+                yield sheet_name, text_index, cells
+        finally:
+            workbook.close()
+
+    return sheet_names, iter_sheets()
+
+
+def _extract_template_values(cells: Dict[Tuple[int, int], object], data: Dict) -> None:
+    """
+    Быстрый путь для известной формы шаблона: чтение по фиксированным
+    координатам.
+
+    Для каждого параметра сначала сверяется подпись в ожидаемой ячейке, и
+    только при совпадении берется значение из соседней. В типовом файле это
+    O(1) чтений из словаря вместо поиска по шаблонам; не найденные здесь
+    параметры добираются обычным поиском.
+
+    Args:
+        cells: Значения ячеек листа по координатам из _index_sheet
+        data: Словарь данных проекта (заполняется на месте)
+    """
+    for key, (label, label_coord, value_coord) in _TEMPLATE_CELLS.items():
+        if data.get(key):
+            continue
+
+        label_value = cells.get(label_coord)
+        if not isinstance(label_value, str) or label not in label_value.lower():
+            continue
+
+        value = _coerce_number(cells.get(value_coord))
+        if value is None:
+            continue
+
+        if key == "irr":
+            # Та же нормализация, что и в особом случае E15:
+            # доля (0.30) переводится в проценты, значения вне 0-100 не берутся
+            if 0 <= value < 1:
+                value = value * 100
+            if not 0 <= value <= 100:
+                continue
+
+        data[key] = value
+        logger.debug(f"{key}: {value} (быстрый путь по шаблону, ячейка {value_coord})")
+
+
+def _find_all_patterns(text_index: List[Tuple[str, int, int]], patterns: List[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Поиск первых вхождений всех шаблонов за один проход по индексу листа.
+
+    Вместо отдельного сканирования индекса на каждый алиас (а у одного
+    параметра их до шести) индекс обходится один раз, и для каждого шаблона
+    запоминается первая ячейка, содержащая его текст.
+
+    Args:
+        text_index: Текстовый индекс листа из _index_sheet
+        patterns: Шаблоны для поиска (в нижнем регистре)
+
+    Returns:
+        Словарь {шаблон: (row, column)} для найденных шаблонов
+    """
+    pending = set(patterns)
+    found: Dict[str, Tuple[int, int]] = {}
+
+    if _AC_AUTOMATON is not None:
+        # Текст каждой ячейки сканируется автоматом один раз, все шаблоны
+        # находятся за этот проход независимо от их количества
+        for cell_text, row, col in text_index:
+            for _, pattern in _AC_AUTOMATON.iter(cell_text):
+                if pattern in pending:
+                    found[pattern] = (row, col)
+                    pending.discard(pattern)
+            if not pending:
+                break
+        return found
+
+    for cell_text, row, col in text_index:
+        matched = [pattern for pattern in pending if pattern in cell_text]
+        for pattern in matched:
+            found[pattern] = (row, col)
+            pending.discard(pattern)
+        if not pending:
+            break
+
+    return found
+
+
+def find_cell_by_text(text_index: List[Tuple[str, int, int]], search_text: str) -> Optional[Tuple[int, int]]:
+    """
+    Поиск ячейки по тексту в индексе листа (без учета регистра).
+
+    Args:
+        text_index: Текстовый индекс листа из _index_sheet
         search_text: Текст для поиска
-        case_sensitive: Учитывать регистр при поиске
-    
+
     Returns:
         Кортеж (row, column) или None, если не найдено
     """
-    search_lower = search_text.lower() if not case_sensitive else search_text
-    
-    for row in worksheet.iter_rows():
-        for cell in row:
-            if cell.value:
-                cell_value = str(cell.value).lower() if not case_sensitive else str(cell.value)
-                if search_lower in cell_value:
-                    logger.debug(f"Найдена ячейка с текстом '{search_text}': {cell.coordinate}")
-                    return (cell.row, cell.column)
-    
+    search_lower = search_text.lower()
+
+    for cell_text, row, col in text_index:
+        if search_lower in cell_text:
+            logger.debug(f"Найдена ячейка с текстом '{search_text}': строка {row}, столбец {col}")
+            return (row, col)
+
+    return None
+
+
+def _coerce_number(cell_value) -> Optional[float]:
+    """
+    Преобразование значения ячейки в число без исключений на горячем пути.
+
+    Сначала проверка типа: для числовых ячеек это просто float(), для строк —
+    извлечение первого числа регулярным выражением. Исключения не
+    используются: в типичном файле большинство ячеек нечисловые, и
+    try/except на каждую из них заметно дороже проверки isinstance.
+
+    Args:
+        cell_value: Значение ячейки
+
+    Returns:
+        Числовое значение или None
+    """
+    if isinstance(cell_value, (int, float)):
+        return float(cell_value)
+    if isinstance(cell_value, str):
+        match = _NUM_RE.search(cell_value.translate(_TBL))
+        if match:
+            return float(match.group(0))
     return None
 
 
-def extract_value_near_cell(worksheet, row: int, col: int, offset: int = 1) -> Optional[float]:
+def extract_value_near_cell(cells: Dict[Tuple[int, int], object], row: int, col: int) -> Optional[float]:
     """
     Извлечение числового значения из ячейки рядом с найденной.
-    
+
     Args:
-        worksheet: Рабочий лист openpyxl
+        cells: Значения ячеек листа по координатам из _index_sheet
         row: Номер строки найденной ячейки
         col: Номер столбца найденной ячейки
-        offset: Смещение для поиска значения (по умолчанию следующая ячейка справа)
-    
+
     Returns:
         Числовое значение или None
     """
     # Пробуем разные позиции: справа, справа+1, справа+2, снизу, снизу+1, снизу+2
-    search_positions = [
+    search_positions = (
         (row, col + 1),      # Справа
         (row, col + 2),      # Справа через одну
         (row, col + 3),      # Справа через две
@@ -58,155 +347,143 @@ def extract_value_near_cell(worksheet, row: int, col: int, offset: int = 1) -> O
         (row + 1, col + 2),  # Снизу справа через одну
         (row + 2, col),      # Снизу через одну
         (row + 2, col + 1),  # Снизу через одну справа
-    ]
-    
+    )
+
     for r, c in search_positions:
-        try:
-            value_cell = worksheet.cell(row=r, column=c)
-            if value_cell.value is not None:
-                # Пробуем преобразовать в число
-                try:
-                    value = float(value_cell.value)
-                    logger.debug(f"Найдено значение {value} в ячейке {value_cell.coordinate}")
-                    return value
-                except (ValueError, TypeError):
-                    # Если не число, пробуем извлечь число из строки
-                    if isinstance(value_cell.value, str):
-                        import re
-                        # Ищем числа в строке (включая проценты)
-                        numbers = re.findall(r'-?\d+\.?\d*', value_cell.value.replace(',', '.').replace('%', ''))
-                        if numbers:
-                            try:
-                                value = float(numbers[0])
-                                logger.debug(f"Извлечено значение {value} из строки '{value_cell.value}'")
-                                return value
-                            except ValueError:
-                                pass
-        except Exception:
-            continue
-    
+        value = _coerce_number(cells.get((r, c)))
+        if value is not None:
+            logger.debug(f"Найдено значение {value} в ячейке (строка {r}, столбец {c})")
+            return value
+
     # Если не нашли рядом, ищем в той же строке или столбце в пределах 10 ячеек
     for i in range(1, 11):
-        try:
-            # Ищем справа
-            value_cell = worksheet.cell(row=row, column=col + i)
-            if value_cell.value is not None:
-                try:
-                    value = float(value_cell.value)
-                    logger.debug(f"Найдено значение {value} в ячейке {value_cell.coordinate} (поиск в строке)")
-                    return value
-                except (ValueError, TypeError):
-                    pass
-        except:
-            pass
-        
-        try:
-            # Ищем снизу
-            value_cell = worksheet.cell(row=row + i, column=col)
-            if value_cell.value is not None:
-                try:
-                    value = float(value_cell.value)
-                    logger.debug(f"Найдено значение {value} в ячейке {value_cell.coordinate} (поиск в столбце)")
-                    return value
-                except (ValueError, TypeError):
-                    pass
-        except:
-            pass
-    
+        # Ищем справа
+        value = _coerce_number(cells.get((row, col + i)))
+        if value is not None:
+            logger.debug(f"Найдено значение {value} (поиск в строке)")
+            return value
+
+        # Ищем снизу
+        value = _coerce_number(cells.get((row + i, col)))
+        if value is not None:
+            logger.debug(f"Найдено значение {value} (поиск в столбце)")
+            return value
+
     return None
 
 
-def extract_project_data(file_path: Path) -> Dict:
+def extract_project_data_from_bytes(data: bytes, file_name: str = "in_memory.xlsx") -> Dict:
+    """
+    Извлечение данных проекта из содержимого Excel файла в памяти.
+
+    Args:
+        data: Содержимое .xlsx файла
+        file_name: Имя файла для логирования
+
+    Returns:
+        Словарь с извлеченными данными
+
+    Raises:
+        ValueError: Если файл не удалось прочитать или не найдены необходимые данные
+    """
+    return extract_project_data(BytesIO(data), file_name=file_name)
+
+
+def extract_project_data(file_path, file_name: Optional[str] = None) -> Dict:
     """
     Извлечение данных проекта из Excel файла.
-    
+
     Args:
-        file_path: Путь к Excel файлу
-    
+        file_path: Путь к Excel файлу или файлоподобный объект (BytesIO)
+        file_name: Имя файла для логирования (по умолчанию берется из пути)
+
     Returns:
         Словарь с извлеченными данными
-    
+
     Raises:
         ValueError: Если файл не удалось прочитать или не найдены необходимые данные
     """
-    logger.info(f"Начало извлечения данных из файла: {file_path.name}")
-    
+    display_name = file_name or (file_path.name if isinstance(file_path, Path) else "in_memory.xlsx")
+    logger.info(f"Начало извлечения данных из файла: {display_name}")
+
     try:
-        workbook = load_workbook(file_path, data_only=True)
-        
-        # Получаем список всех листов
-        sheet_names = workbook.sheetnames
+        sheets = None
+        if CalamineWorkbook is not None:
+            try:
+                sheet_names, sheets = _load_sheets_calamine(file_path)
+            except Exception as e:
+                logger.debug(f"Calamine не смог прочитать файл ({e!r}), переход на openpyxl")
+                if hasattr(file_path, "seek"):
+                    file_path.seek(0)
+        if sheets is None:
+            sheet_names, sheets = _load_sheets_openpyxl(file_path)
+
         logger.debug(f"Найдено листов в файле: {len(sheet_names)}: {', '.join(sheet_names)}")
-        
+
         data = {}
-        
+
         # Ищем данные на всех листах
-        for sheet_name in sheet_names:
-            worksheet = workbook[sheet_name]
-            logger.debug(f"Обработка листа: {worksheet.title}")
-        
+        for sheet_num, (sheet_name, text_index, cells) in enumerate(sheets):
+            logger.debug(f"Обработка листа: {sheet_name}")
+            is_first_sheet = sheet_num == 0
+
             # Поиск параметров проекта (только на первом листе)
-            if sheet_name == sheet_names[0]:
+            if is_first_sheet:
                 # Тип проекта - ищем "тип проекта" или просто значение "Метро"
-                project_type_cell = find_cell_by_text(worksheet, "тип проекта", case_sensitive=False)
+                project_type_cell = find_cell_by_text(text_index, "тип проекта")
                 if not project_type_cell:
                     # Пробуем найти просто "Метро" или другие типы
                     for project_type in ["метро", "дорога", "энергетика", "мост", "тоннель"]:
-                        project_type_cell = find_cell_by_text(worksheet, project_type, case_sensitive=False)
+                        project_type_cell = find_cell_by_text(text_index, project_type)
                         if project_type_cell:
-                            row, col = project_type_cell
-                            cell = worksheet.cell(row=row, column=col)
-                            if cell.value and isinstance(cell.value, str):
-                                data["type"] = cell.value.strip()
+                            cell_value = cells.get(project_type_cell)
+                            if cell_value and isinstance(cell_value, str):
+                                data["type"] = cell_value.strip()
                                 logger.debug(f"Тип проекта: {data['type']} (лист: {sheet_name})")
                                 break
-                
+
                 if project_type_cell and "type" not in data:
                     # Пробуем извлечь тип проекта из соседних ячеек
                     row, col = project_type_cell
                     for offset in [1, 2, -1, -2]:
-                        try:
-                            cell = worksheet.cell(row=row, column=col + offset)
-                            if cell.value and isinstance(cell.value, str) and len(cell.value) > 2:
-                                # Пропускаем служебные тексты
-                                if cell.value.strip().upper() not in ["ПАРАМЕТРЫ ПРОЕКТА", "ПРОЕКТ", "ТИП"]:
-                                    data["type"] = cell.value.strip()
-                                    logger.debug(f"Тип проекта: {data['type']} (лист: {sheet_name})")
-                                    break
-                        except:
-                            continue
-                
+                        cell_value = cells.get((row, col + offset))
+                        if cell_value and isinstance(cell_value, str) and len(cell_value) > 2:
+                            # Пропускаем служебные тексты
+                            if cell_value.strip().upper() not in ["ПАРАМЕТРЫ ПРОЕКТА", "ПРОЕКТ", "ТИП"]:
+                                data["type"] = cell_value.strip()
+                                logger.debug(f"Тип проекта: {data['type']} (лист: {sheet_name})")
+                                break
+
                 if "type" not in data:
                     data["type"] = "Не указан"
-            
-            # Поиск числовых параметров на всех листах
-            search_patterns = {
-                "capex": ["стоимость строительства", "capex", "капитальные затраты", "инвестиции"],
-                "construction_years": ["срок строительства", "период строительства", "длительность строительства"],
-                "debt_share": ["доля долга", "процент долга", "доля заемных средств"],
-                "debt_rate": ["ставка по долгу", "ставка долга", "процент по долгу", "ставка займа", "процент долга"],
-                "discount_rate": ["ставка дисконтирования", "дисконт", "ставка дисконта", "ставка дисконтирования для бизнеса"],
-                "npv": ["npv", "чистая приведенная стоимость", "чистая приведённая стоимость", "чистый приведенный доход", "чистая приведённая стоимость, млн. руб", "чистая приведённая стоимость, млн руб"],
-                "irr": ["irr", "внутренняя норма доходности", "внутренняя норма рентабельности"],
-                "payback_period": ["срок окупаемости", "период окупаемости", "окупаемость", "payback", "окупаемость, лет"]
-            }
-            
+
+                # Быстрый путь для типовой формы файла: параметры читаются
+                # по известным координатам, остальное добирает общий поиск
+                _extract_template_values(cells, data)
+
+            # Поиск числовых параметров на всех листах: все алиасы ищутся
+            # за один проход по индексу, извлечение рядом с ячейкой
+            # мемоизируется по координате (разные алиасы часто попадают
+            # в одну и ту же ячейку)
+            pattern_positions = _find_all_patterns(text_index, _ALL_PATTERNS)
+            near_cache: Dict[Tuple[int, int], Optional[float]] = {}
+
             # Ищем параметры, которые еще не найдены
-            for key, patterns in search_patterns.items():
+            for key, patterns in _SEARCH_PATTERNS.items():
                 # Пропускаем, если параметр уже найден
                 if key in data and data[key] != 0.0:
                     continue
-                    
+
                 found = False
-                
+
                 # Специальная обработка для IRR - проверяем E15 (значение рядом с D15, где текст)
-                if key == "irr" and sheet_name == sheet_names[0]:
+                if key == "irr" and is_first_sheet:
                     try:
                         # Проверяем E15 (столбец 5, строка 15) - значение рядом с текстом в D15
-                        cell = worksheet.cell(row=15, column=5)  # E = 5
-                        if cell.value is not None:
+                        cell_value = cells.get((15, 5))  # E = 5
+                        if cell_value is not None:
                             try:
-                                value = float(cell.value)
+                                value = float(cell_value)
                                 # Если значение меньше 1, это десятичная дробь (0.30 = 30%), умножаем на 100
                                 if 0 <= value < 1:
                                     value = value * 100
@@ -216,9 +493,8 @@ def extract_project_data(file_path: Path) -> Dict:
                                     found = True
                             except (ValueError, TypeError):
                                 # Пробуем извлечь из строки (например, "30%")
-                                if isinstance(cell.value, str):
-                                    import re
-                                    numbers = re.findall(r'\d+\.?\d*', cell.value.replace(',', '.').replace('%', ''))
+                                if isinstance(cell_value, str):
+                                    numbers = _NUM_RE.findall(cell_value.translate(_TBL))
                                     if numbers:
                                         val = float(numbers[0])
                                         # Если значение меньше 1, умножаем на 100
@@ -226,25 +502,24 @@ def extract_project_data(file_path: Path) -> Dict:
                                             val = val * 100
                                         if 0 <= val <= 100:
                                             data[key] = val
-                                            logger.debug(f"{key}: {val} (лист: {sheet_name}, ячейка E15, из текста '{cell.value}')")
+                                            logger.debug(f"{key}: {val} (лист: {sheet_name}, ячейка E15, из текста '{cell_value}')")
                                             found = True
-                        
+
                         # Также проверяем D15 и D16 на случай, если значение там
                         if not found:
                             for row_num in [15, 16]:
-                                cell = worksheet.cell(row=row_num, column=4)  # D = 4
-                                if cell.value is not None:
+                                cell_value = cells.get((row_num, 4))  # D = 4
+                                if cell_value is not None:
                                     try:
-                                        value = float(cell.value)
+                                        value = float(cell_value)
                                         if 0 <= value <= 100:
                                             data[key] = value
                                             logger.debug(f"{key}: {value} (лист: {sheet_name}, ячейка D{row_num})")
                                             found = True
                                             break
                                     except (ValueError, TypeError):
-                                        if isinstance(cell.value, str):
-                                            import re
-                                            numbers = re.findall(r'\d+\.?\d*', cell.value.replace(',', '.').replace('%', ''))
+                                        if isinstance(cell_value, str):
+                                            numbers = _NUM_RE.findall(cell_value.translate(_TBL))
                                             if numbers:
                                                 val = float(numbers[0])
                                                 if 0 <= val <= 100:
@@ -254,27 +529,26 @@ def extract_project_data(file_path: Path) -> Dict:
                                                     break
                     except Exception as e:
                         logger.debug(f"Ошибка при проверке D15-E15 для IRR: {e}")
-                
+
                 if found:
                     continue
-                    
+
                 for pattern in patterns:
-                    cell_pos = find_cell_by_text(worksheet, pattern, case_sensitive=False)
+                    cell_pos = pattern_positions.get(pattern)
                     if cell_pos:
                         # Сначала проверяем саму найденную ячейку на наличие числа
                         row, col = cell_pos
-                        cell = worksheet.cell(row=row, column=col)
-                        if cell.value:
+                        cell_value = cells.get((row, col))
+                        if cell_value:
                             # Пробуем извлечь число из самой ячейки
-                            if isinstance(cell.value, (int, float)):
-                                data[key] = float(cell.value)
+                            if isinstance(cell_value, (int, float)):
+                                data[key] = float(cell_value)
                                 logger.debug(f"{key}: {data[key]} (лист: {sheet_name}, из самой ячейки)")
                                 found = True
                                 break
-                            elif isinstance(cell.value, str):
-                                import re
+                            elif isinstance(cell_value, str):
                                 # Ищем числа в строке (включая проценты)
-                                numbers = re.findall(r'-?\d+\.?\d*', cell.value.replace(',', '.').replace('%', ''))
+                                numbers = _NUM_RE.findall(cell_value.translate(_TBL))
                                 if numbers:
                                     try:
                                         value = float(numbers[0])
@@ -284,41 +558,46 @@ def extract_project_data(file_path: Path) -> Dict:
                                         break
                                     except ValueError:
                                         pass
-                        
+
                         # Если не нашли в самой ячейке, ищем рядом
-                        value = extract_value_near_cell(worksheet, row, col)
+                        # (результат кэшируется по координате)
+                        if cell_pos not in near_cache:
+                            near_cache[cell_pos] = extract_value_near_cell(cells, row, col)
+                        value = near_cache[cell_pos]
                         if value is not None:
                             data[key] = value
                             logger.debug(f"{key}: {value} (лист: {sheet_name})")
                             found = True
                             break
-                
+
                 if not found and key not in data:
                     data[key] = 0.0
-        
-        workbook.close()
-        
+
+            # Все параметры найдены — оставшиеся листы можно не разбирать
+            if all(data.get(key) for key in _SEARCH_PATTERNS):
+                logger.debug(f"Все параметры найдены, пропуск оставшихся листов ({len(sheet_names) - sheet_num - 1})")
+                break
+
         # Логируем предупреждения для не найденных параметров
-        for key in search_patterns.keys():
+        for key in _SEARCH_PATTERNS.keys():
             if key not in data or data[key] == 0.0:
                 logger.warning(f"Не удалось найти параметр: {key}")
-        
+
         # Проверка наличия критических данных
         required_fields = ["npv", "irr", "payback_period"]
         missing_fields = [field for field in required_fields if field not in data or data[field] == 0.0]
-        
+
         if missing_fields:
             raise ValueError(
                 f"В файле не найдены необходимые данные: {', '.join(missing_fields)}. "
                 "Проверьте структуру файла."
             )
-        
+
         logger.info("Данные успешно извлечены из файла")
         return data
-        
+
     except openpyxl.utils.exceptions.InvalidFileException:
         raise ValueError("Не удалось прочитать файл. Убедитесь, что файл не поврежден.")
     except Exception as e:
         logger.error(f"Ошибка при извлечении данных: {e}", exc_info=True)
         raise ValueError(f"Ошибка обработки файла: {str(e)}")
-
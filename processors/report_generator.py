@@ -1,17 +1,104 @@
 """Модуль для генерации отчета анализа рисков в Excel."""
 
+import asyncio
+import re
+import zipfile
 from pathlib import Path
-from typing import Dict
-import shutil
-import openpyxl
-from openpyxl import load_workbook
+from typing import Dict, List
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
 
 from logger import get_logger
 
 logger = get_logger("report_generator")
 
+# Разбиение текста видения бизнеса на предложения: по концу предложения
+# с пробелом после или по переносам строк
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+# Стили отчета: объекты стилей openpyxl неизменяемы, поэтому создаются один
+# раз на модуль и переиспользуются по ссылке вместо пересоздания в циклах
+_TITLE_FONT = Font(bold=True, size=16)
+_HEADER_FONT = Font(bold=True, size=14, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_SECTION_FONT = Font(bold=True, size=12)
+_BOLD_FONT = Font(bold=True)
+_BOLD_FONT_12 = Font(bold=True, size=12)
+_RISK_LEVEL_FONT = Font(bold=True, size=12, color="FFFFFF")
+_NEGATIVE_FONT = Font(color="C00000")  # Красный для отрицательных значений
+_LOSSES_FONT = Font(color="C00000", bold=True)
+_TOTAL_LOSSES_FONT = Font(bold=True, size=12, color="C00000")
+_BORDER_THIN = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+_CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+_WRAP_ALIGNMENT = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+
+def _save_workbook_fast(workbook: Workbook, output_path: Path) -> None:
+    """
+    Сохранение книги в zip с deflate уровня 1 вместо стандартного 6.
+
+    Отчет небольшой, и на горячем пути важнее время сжатия, чем лишние
+    проценты размера файла; workbook.save такой настройки не дает, поэтому
+    архив открывается явно, как это делает openpyxl.writer.excel.
+
+    Args:
+        workbook: Книга для сохранения
+        output_path: Путь к выходному файлу
+    """
+    with zipfile.ZipFile(
+        output_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True, compresslevel=1
+    ) as archive:
+        ExcelWriter(workbook, archive).save()
+
+# Цветовая индикация уровня риска
+_RISK_LEVEL_FILLS = {
+    level: PatternFill(start_color=color, end_color=color, fill_type="solid")
+    for level, color in {
+        "Низкий": "00B050",  # Зеленый
+        "Средний": "FFC000",  # Желтый
+        "Высокий": "FF6600",  # Оранжевый
+        "Критический": "C00000"  # Красный
+    }.items()
+}
+
+
+def _styled_row(worksheet, values, font=None, fill=None, alignment=None, border=None) -> List:
+    """
+    Построение строки write_only ячеек с одинаковыми стилями.
+
+    Args:
+        worksheet: Лист write_only книги
+        values: Значения ячеек строки
+        font: Шрифт для всех ячеек (опционально)
+        fill: Заливка для всех ячеек (опционально)
+        alignment: Выравнивание для всех ячеек (опционально)
+        border: Рамка для всех ячеек (опционально)
+
+    Returns:
+        Список ячеек для передачи в ws.append
+    """
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(worksheet, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        if border is not None:
+            cell.border = border
+        row.append(cell)
+    return row
+
 
 def create_risk_analysis_sheet(
     original_file_path: Path,
@@ -20,80 +107,58 @@ def create_risk_analysis_sheet(
     risk_analysis: Dict
 ) -> Path:
     """
-    Создание нового листа "Анализ_рисков" в Excel файле.
-    
+    Создание отчета с листом "Анализ_рисков" в Excel файле.
+
+    Отчет собирается в новой книге в режиме write_only: исходный файл не
+    копируется и не загружается вообще, поэтому память и время не зависят
+    от размера загруженной пользователем модели.
+
     Args:
         original_file_path: Путь к исходному Excel файлу
         project_params: Параметры проекта
         model_results: Результаты финансовой модели
         risk_analysis: Результаты анализа рисков от ИИ
-    
+
     Returns:
         Путь к сохраненному файлу с анализом
     """
     logger.info(f"Создание листа 'Анализ_рисков' для файла: {original_file_path.name}")
-    
+
     try:
         # Определяем путь для выходного файла
         output_filename = original_file_path.stem + "_анализ.xlsx"
         output_path = original_file_path.parent / output_filename
-        
-        # Копируем исходный файл, чтобы сохранить все его элементы (формулы, диаграммы, data validation и т.д.)
-        logger.debug(f"Копирование исходного файла для сохранения всех элементов")
-        shutil.copy2(original_file_path, output_path)
-        logger.debug(f"Файл скопирован: {output_path.name}")
-        
-        # Открываем копию файла в режиме read_only=False для возможности записи
-        workbook = load_workbook(output_path, read_only=False)
-        
-        # Проверка, существует ли уже лист "Анализ_рисков"
-        if "Анализ_рисков" in workbook.sheetnames:
-            logger.warning("Лист 'Анализ_рисков' уже существует, будет перезаписан")
-            workbook.remove(workbook["Анализ_рисков"])
-        
-        # Создание нового листа
+
+        workbook = Workbook(write_only=True)
         sheet = workbook.create_sheet("Анализ_рисков")
-        
-        # Стили для форматирования
-        header_font = Font(bold=True, size=14, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        section_font = Font(bold=True, size=12)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        center_alignment = Alignment(horizontal='center', vertical='center')
-        wrap_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        
-        row = 1
-        
+
+        # В write_only режиме строки записываются строго по порядку, а ширины
+        # столбцов и объединения должны быть заданы до записи строк — поэтому
+        # лист сначала собирается в буфере, затем выгружается одним проходом
+        rows_buffer: List[List] = []
+        merges: List[str] = []
+
         # Заголовок
-        sheet.merge_cells(f'A{row}:D{row}')
-        title_cell = sheet[f'A{row}']
-        title_cell.value = "Результат анализа рисков проекта"
-        title_cell.font = Font(bold=True, size=16)
-        title_cell.alignment = center_alignment
-        row += 2
-        
+        title_cell = WriteOnlyCell(sheet, value="Результат анализа рисков проекта")
+        title_cell.font = _TITLE_FONT
+        title_cell.alignment = _CENTER_ALIGNMENT
+        rows_buffer.append([title_cell])
+        merges.append("A1:D1")
+        rows_buffer.append([])
+
         # Секция 1: Ключевые показатели
-        sheet[f'A{row}'] = "Ключевые показатели проекта"
-        sheet[f'A{row}'].font = section_font
-        row += 1
-        
+        section_cell = WriteOnlyCell(sheet, value="Ключевые показатели проекта")
+        section_cell.font = _SECTION_FONT
+        rows_buffer.append([section_cell])
+
         # Заголовки таблицы показателей
         headers = ["Параметр", "Значение", "Единица измерения"]
-        for col_idx, header in enumerate(headers, start=1):
-            cell = sheet.cell(row=row, column=col_idx)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = center_alignment
-            cell.border = border
-        
-        row += 1
-        
+        rows_buffer.append(_styled_row(
+            sheet, headers,
+            font=_HEADER_FONT, fill=_HEADER_FILL,
+            alignment=_CENTER_ALIGNMENT, border=_BORDER_THIN
+        ))
+
         # Данные показателей
         indicators = [
             ("Тип проекта", project_params.get("type", "Не указан"), ""),
@@ -106,80 +171,61 @@ def create_risk_analysis_sheet(
             ("IRR", model_results.get("irr", 0), "%"),
             ("Срок окупаемости", model_results.get("payback_period", 0), "лет")
         ]
-        
-        for param_name, value, unit in indicators:
-            sheet.cell(row=row, column=1).value = param_name
-            sheet.cell(row=row, column=1).border = border
-            sheet.cell(row=row, column=2).value = value
-            sheet.cell(row=row, column=2).border = border
-            sheet.cell(row=row, column=3).value = unit
-            sheet.cell(row=row, column=3).border = border
-            row += 1
-        
-        row += 2
-        
+
+        for indicator in indicators:
+            rows_buffer.append(_styled_row(sheet, indicator, border=_BORDER_THIN))
+
+        rows_buffer.extend(([], []))
+
         # Секция 2: Заключение ИИ
-        sheet[f'A{row}'] = "Заключение ИИ-анализа"
-        sheet[f'A{row}'].font = section_font
-        row += 1
-        
+        section_cell = WriteOnlyCell(sheet, value="Заключение ИИ-анализа")
+        section_cell.font = _SECTION_FONT
+        rows_buffer.append([section_cell])
+
         # Уровень риска
         risk_level = risk_analysis.get("risk_level", "Не определен")
-        sheet[f'A{row}'] = "Уровень риска:"
-        sheet[f'A{row}'].font = Font(bold=True)
-        sheet[f'B{row}'] = risk_level
-        sheet[f'B{row}'].font = Font(bold=True, size=12)
-        
+        label_cell = WriteOnlyCell(sheet, value="Уровень риска:")
+        label_cell.font = _BOLD_FONT
+        level_cell = WriteOnlyCell(sheet, value=risk_level)
+        level_cell.font = _BOLD_FONT_12
+
         # Цветовая индикация уровня риска
-        risk_colors = {
-            "Низкий": "00B050",  # Зеленый
-            "Средний": "FFC000",  # Желтый
-            "Высокий": "FF6600",  # Оранжевый
-            "Критический": "C00000"  # Красный
-        }
-        if risk_level in risk_colors:
-            sheet[f'B{row}'].fill = PatternFill(
-                start_color=risk_colors[risk_level],
-                end_color=risk_colors[risk_level],
-                fill_type="solid"
-            )
-            sheet[f'B{row}'].font = Font(bold=True, size=12, color="FFFFFF")
-        
-        row += 1
-        
+        if risk_level in _RISK_LEVEL_FILLS:
+            level_cell.fill = _RISK_LEVEL_FILLS[risk_level]
+            level_cell.font = _RISK_LEVEL_FONT
+        rows_buffer.append([label_cell, level_cell])
+
         # Обоснование
-        sheet[f'A{row}'] = "Обоснование:"
-        sheet[f'A{row}'].font = Font(bold=True)
-        sheet.merge_cells(f'B{row}:D{row+2}')
-        reason_cell = sheet[f'B{row}']
-        reason_cell.value = risk_analysis.get("reason", "Не предоставлено")
-        reason_cell.alignment = wrap_alignment
-        reason_cell.border = border
-        row += 3
-        
+        label_cell = WriteOnlyCell(sheet, value="Обоснование:")
+        label_cell.font = _BOLD_FONT
+        reason_cell = WriteOnlyCell(sheet, value=risk_analysis.get("reason", "Не предоставлено"))
+        reason_cell.alignment = _WRAP_ALIGNMENT
+        reason_cell.border = _BORDER_THIN
+        rows_buffer.append([label_cell, reason_cell])
+        merges.append(f"B{len(rows_buffer)}:D{len(rows_buffer) + 2}")
+        rows_buffer.extend(([], []))
+
         # Критические факторы
-        sheet[f'A{row}'] = "Критические факторы:"
-        sheet[f'A{row}'].font = Font(bold=True)
-        row += 1
-        
+        label_cell = WriteOnlyCell(sheet, value="Критические факторы:")
+        label_cell.font = _BOLD_FONT
+        rows_buffer.append([label_cell])
+
         critical_factors = risk_analysis.get("critical_factors", [])
         if critical_factors:
             for factor in critical_factors:
-                sheet.cell(row=row, column=1).value = f"• {factor}"
-                row += 1
+                rows_buffer.append([f"• {factor}"])
         else:
-            sheet.cell(row=row, column=1).value = "Не выявлены"
-            row += 1
-        
-        row += 2
-        
+            rows_buffer.append(["Не выявлены"])
+
+        rows_buffer.extend(([], []))
+
         # Секция 3: Анализ сценариев
         scenarios = risk_analysis.get("scenarios", [])
         if scenarios:
-            sheet[f'A{row}'] = "Анализ непредвиденных ситуаций"
-            sheet[f'A{row}'].font = section_font
-            row += 1
-            
+            section_cell = WriteOnlyCell(sheet, value="Анализ непредвиденных ситуаций")
+            section_cell.font = _SECTION_FONT
+            rows_buffer.append([section_cell])
+
             # Заголовки таблицы сценариев
             scenario_headers = [
                 "Сценарий",
@@ -189,146 +235,132 @@ def create_risk_analysis_sheet(
                 "Вероятность",
                 "Потенциальные убытки, млн руб"
             ]
-            
-            for col_idx, header in enumerate(scenario_headers, start=1):
-                cell = sheet.cell(row=row, column=col_idx)
-                cell.value = header
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_alignment
-                cell.border = border
-            
-            row += 1
-            
-            # Данные сценариев
+
+            rows_buffer.append(_styled_row(
+                sheet, scenario_headers,
+                font=_HEADER_FONT, fill=_HEADER_FILL,
+                alignment=_CENTER_ALIGNMENT, border=_BORDER_THIN
+            ))
+
+            # Данные сценариев: строка собирается целиком, затем
+            # дооформляются только отличающиеся ячейки
             for scenario in scenarios:
-                sheet.cell(row=row, column=1).value = scenario.get("name", "Не указан")
-                sheet.cell(row=row, column=1).border = border
-                
-                sheet.cell(row=row, column=2).value = scenario.get("description", "")
-                sheet.cell(row=row, column=2).alignment = wrap_alignment
-                sheet.cell(row=row, column=2).border = border
-                
                 npv_impact = scenario.get("npv_impact", 0)
-                sheet.cell(row=row, column=3).value = npv_impact
-                sheet.cell(row=row, column=3).border = border
-                if npv_impact < 0:
-                    sheet.cell(row=row, column=3).font = Font(color="C00000")  # Красный для отрицательных
-                
                 irr_impact = scenario.get("irr_impact", 0)
-                sheet.cell(row=row, column=4).value = irr_impact
-                sheet.cell(row=row, column=4).border = border
-                if irr_impact < 0:
-                    sheet.cell(row=row, column=4).font = Font(color="C00000")
-                
-                sheet.cell(row=row, column=5).value = scenario.get("probability", "Не указана")
-                sheet.cell(row=row, column=5).border = border
-                
                 potential_losses = scenario.get("potential_losses", 0)
-                sheet.cell(row=row, column=6).value = potential_losses
-                sheet.cell(row=row, column=6).border = border
+
+                scenario_row = _styled_row(sheet, [
+                    scenario.get("name", "Не указан"),
+                    scenario.get("description", ""),
+                    npv_impact,
+                    irr_impact,
+                    scenario.get("probability", "Не указана"),
+                    potential_losses
+                ], border=_BORDER_THIN)
+
+                scenario_row[1].alignment = _WRAP_ALIGNMENT
+                if npv_impact < 0:
+                    scenario_row[2].font = _NEGATIVE_FONT
+                if irr_impact < 0:
+                    scenario_row[3].font = _NEGATIVE_FONT
                 if potential_losses > 0:
-                    sheet.cell(row=row, column=6).font = Font(color="C00000", bold=True)
-                
-                row += 1
-            
-            row += 1
-        
+                    scenario_row[5].font = _LOSSES_FONT
+
+                rows_buffer.append(scenario_row)
+
+            rows_buffer.append([])
+
         # Секция 4: Суммарные потенциальные убытки
         total_losses = risk_analysis.get("total_potential_losses", 0)
         if total_losses > 0:
-            sheet[f'A{row}'] = "Суммарные потенциальные убытки:"
-            sheet[f'A{row}'].font = Font(bold=True, size=12)
-            sheet[f'B{row}'] = f"{total_losses} млн руб"
-            sheet[f'B{row}'].font = Font(bold=True, size=12, color="C00000")
-            row += 2
-        
+            label_cell = WriteOnlyCell(sheet, value="Суммарные потенциальные убытки:")
+            label_cell.font = _BOLD_FONT_12
+            value_cell = WriteOnlyCell(sheet, value=f"{total_losses} млн руб")
+            value_cell.font = _TOTAL_LOSSES_FONT
+            rows_buffer.append([label_cell, value_cell])
+            rows_buffer.append([])
+
         # Секция 5: Рекомендации по снижению рисков
         risk_mitigation = risk_analysis.get("risk_mitigation", [])
         if risk_mitigation:
-            sheet[f'A{row}'] = "Рекомендации по снижению рисков:"
-            sheet[f'A{row}'].font = section_font
-            row += 1
-            
+            section_cell = WriteOnlyCell(sheet, value="Рекомендации по снижению рисков:")
+            section_cell.font = _SECTION_FONT
+            rows_buffer.append([section_cell])
+
             for recommendation in risk_mitigation:
-                sheet.cell(row=row, column=1).value = f"• {recommendation}"
-                sheet.cell(row=row, column=1).alignment = wrap_alignment
-                row += 1
-        
-        row += 2
-        
+                cell = WriteOnlyCell(sheet, value=f"• {recommendation}")
+                cell.alignment = _WRAP_ALIGNMENT
+                rows_buffer.append([cell])
+
+        rows_buffer.extend(([], []))
+
         # Секция 6: Видение бизнеса
         business_vision = risk_analysis.get("business_vision", "")
         if business_vision:
-            sheet[f'A{row}'] = "Предложение дальнейшего видения бизнеса:"
-            sheet[f'A{row}'].font = section_font
-            row += 1
-            
-            # Разделяем видение на отдельные предложения для лучшей читаемости
-            # Разбиваем по точкам, но сохраняем структуру
-            vision_sentences = []
-            
-            # Сначала пробуем разбить по точкам с пробелом после
-            parts = business_vision.split('. ')
-            for i, part in enumerate(parts):
-                part = part.strip()
-                if part:
-                    # Если это не последняя часть или последняя часть не заканчивается точкой
-                    if i < len(parts) - 1 or not part.endswith('.'):
-                        if not part.endswith('.'):
-                            vision_sentences.append(part + '.')
-                        else:
-                            vision_sentences.append(part)
-                    else:
-                        vision_sentences.append(part)
-            
-            # Если не удалось разбить на предложения (меньше 2), используем исходный текст
-            if len(vision_sentences) <= 1:
-                # Пробуем разбить по переносам строк
-                vision_sentences = [s.strip() for s in business_vision.split('\n') if s.strip()]
-                if len(vision_sentences) <= 1:
-                    vision_sentences = [business_vision]
-            
+            section_cell = WriteOnlyCell(sheet, value="Предложение дальнейшего видения бизнеса:")
+            section_cell.font = _SECTION_FONT
+            rows_buffer.append([section_cell])
+
+            # Разделяем видение на отдельные предложения для лучшей читаемости:
+            # один проход предкомпилированного регулярного выражения вместо
+            # каскада split/strip
+            vision_sentences = [s.strip() for s in _SENTENCE_RE.split(business_vision) if s.strip()]
+            if not vision_sentences:
+                vision_sentences = [business_vision]
+
             # Выводим каждое предложение с маркером
             for sentence in vision_sentences:
-                sentence = sentence.strip()
+                # Убираем лишние точки в начале
+                if sentence.startswith('.'):
+                    sentence = sentence[1:].strip()
                 if sentence:
-                    # Убираем лишние точки в начале
-                    if sentence.startswith('.'):
-                        sentence = sentence[1:].strip()
-                    sheet.cell(row=row, column=1).value = f"• {sentence}"
-                    sheet.cell(row=row, column=1).alignment = wrap_alignment
-                    # Расширяем ячейку для длинного текста
-                    sheet.column_dimensions['A'].width = max(sheet.column_dimensions['A'].width or 0, 80)
-                    row += 1
-            
-            row += 1
-        
+                    cell = WriteOnlyCell(sheet, value=f"• {sentence}")
+                    cell.alignment = _WRAP_ALIGNMENT
+                    rows_buffer.append([cell])
+
+            rows_buffer.append([])
+
         # Секция 7: Примерная окупаемость бизнеса
         estimated_payback = risk_analysis.get("estimated_payback")
         if estimated_payback is not None:
-            sheet[f'A{row}'] = "Примерная окупаемость бизнеса (с учетом перспектив развития):"
-            sheet[f'A{row}'].font = Font(bold=True)
-            sheet[f'B{row}'] = f"{estimated_payback} лет"
-            sheet[f'B{row}'].font = Font(bold=True, size=12)
-            row += 2
-        
-        # Автоподбор ширины столбцов
-        for col in range(1, 7):
-            max_length = 0
-            column_letter = get_column_letter(col)
-            for cell in sheet[column_letter]:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
-        
+            label_cell = WriteOnlyCell(sheet, value="Примерная окупаемость бизнеса (с учетом перспектив развития):")
+            label_cell.font = _BOLD_FONT
+            value_cell = WriteOnlyCell(sheet, value=f"{estimated_payback} лет")
+            value_cell.font = _BOLD_FONT_12
+            rows_buffer.append([label_cell, value_cell])
+            rows_buffer.append([])
+
+        # Автоподбор ширины столбцов (до записи строк — требование write_only):
+        # максимумы накапливаются за один проход по буферу, а не по проходу
+        # на каждый столбец
+        col_widths = [0] * 6
+        for buffered_row in rows_buffer:
+            for col_idx, cell in enumerate(buffered_row[:6]):
+                # В буфере лежат и ячейки, и простые значения
+                value = cell.value if hasattr(cell, "value") else cell
+                if value:
+                    length = len(str(value))
+                    if length > col_widths[col_idx]:
+                        col_widths[col_idx] = length
+
+        for col_idx, width in enumerate(col_widths, start=1):
+            sheet.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, 50)
+
+        # Для длинного текста видения бизнеса столбец A расширяется один раз
+        if business_vision:
+            sheet.column_dimensions['A'].width = 80
+
+        # Объединения ячеек (write_only лист принимает их через merged_cells)
+        for merge_range in merges:
+            sheet.merged_cells.ranges.add(merge_range)
+
+        # Выгрузка буфера на лист одним проходом
+        for buffered_row in rows_buffer:
+            sheet.append(buffered_row)
+
         # Сохранение файла
         try:
-            workbook.save(output_path)
+            _save_workbook_fast(workbook, output_path)
             logger.debug("Файл успешно сохранен")
         except Exception as save_error:
             workbook.close()
@@ -340,25 +372,30 @@ def create_risk_analysis_sheet(
                 except:
                     pass
             raise ValueError(f"Ошибка сохранения файла: {str(save_error)}")
-        
+
         workbook.close()
-        
+
         # Проверяем, что файл создан и не пустой
         if not output_path.exists():
             raise ValueError("Файл не был создан после сохранения")
-        
+
         file_size = output_path.stat().st_size
         if file_size == 0:
             output_path.unlink()
             raise ValueError("Созданный файл пустой")
-        
+
         if file_size < 1000:  # Минимальный размер для валидного Excel файла
             logger.warning(f"Файл очень маленький ({file_size} байт), возможно поврежден")
-        
-        # Пробуем открыть файл для проверки валидности
+
+        # Структурная проверка вместо полной повторной загрузки книги:
+        # пустой или оборванный файл ловится по zip-архиву и наличию
+        # xl/workbook.xml без разбора стилей и данных листов
         try:
-            test_workbook = load_workbook(output_path, read_only=True, data_only=True)
-            test_workbook.close()
+            if not zipfile.is_zipfile(output_path):
+                raise ValueError("файл не является zip-архивом")
+            with zipfile.ZipFile(output_path) as archive:
+                if "xl/workbook.xml" not in archive.namelist():
+                    raise ValueError("в архиве отсутствует xl/workbook.xml")
             logger.debug("Файл успешно прошел валидацию")
         except Exception as validation_error:
             logger.error(f"Файл не прошел валидацию: {validation_error}")
@@ -366,11 +403,40 @@ def create_risk_analysis_sheet(
             if output_path.exists():
                 output_path.unlink()
             raise ValueError(f"Созданный файл поврежден и не может быть открыт: {validation_error}")
-        
+
         logger.info(f"Отчет успешно создан: {output_path.name} (размер: {file_size} байт)")
         return output_path
-        
+
     except Exception as e:
         logger.error(f"Ошибка при создании отчета: {e}", exc_info=True)
         raise ValueError(f"Ошибка генерации отчета: {str(e)}")
 
+
+async def create_risk_analysis_sheet_async(
+    original_file_path: Path,
+    project_params: Dict,
+    model_results: Dict,
+    risk_analysis: Dict
+) -> Path:
+    """
+    Асинхронная обертка над create_risk_analysis_sheet.
+
+    Сборка и сохранение книги — синхронный CPU и дисковый ввод-вывод;
+    вынос в пул потоков не дает им блокировать event loop бота.
+
+    Args:
+        original_file_path: Путь к исходному Excel файлу
+        project_params: Параметры проекта
+        model_results: Результаты финансовой модели
+        risk_analysis: Результаты анализа рисков от ИИ
+
+    Returns:
+        Путь к сохраненному файлу с анализом
+    """
+    return await asyncio.to_thread(
+        create_risk_analysis_sheet,
+        original_file_path,
+        project_params,
+        model_results,
+        risk_analysis
+    )
@@ -2,6 +2,35 @@
 
 from typing import Dict, Literal
 
+import numpy as np
+
+# Таблицы порогов и баллов: вместо цепочек if/elif балл каждого фактора
+# выбирается через np.searchsorted, что позволяет считать и скаляры, и
+# целые массивы проектов одной формулой.
+# Для условий вида "x < порог" используется side='right', для "x > порог" —
+# side='left'; баллы упорядочены от самой рискованной зоны к безопасной
+# (или наоборот) в соответствии с исходными ветками.
+
+# 1. Финансовая устойчивость (вес 40%)
+_NPV_THRESHOLDS = np.array([0.0, 50.0])
+_NPV_SCORES = np.array([40, 20, 0])
+_PAYBACK_THRESHOLDS = np.array([10.0, 15.0])
+_PAYBACK_SCORES = np.array([0, 20, 30])
+
+# 2. Долговая нагрузка (вес 30%)
+_DEBT_SHARE_THRESHOLDS = np.array([50.0, 70.0])
+_DEBT_SHARE_SCORES = np.array([0, 25, 35])
+_DEBT_RATE_THRESHOLDS = np.array([15.0, 20.0])
+_DEBT_RATE_SCORES = np.array([0, 20, 30])
+
+# 3. Временные риски (вес 20%)
+_CONSTRUCTION_THRESHOLDS = np.array([5.0, 7.0])
+_CONSTRUCTION_SCORES = np.array([0, 15, 25])
+
+# 4. Ставка дисконтирования (вес 10%)
+_DISCOUNT_THRESHOLDS = np.array([20.0, 25.0])
+_DISCOUNT_SCORES = np.array([0, 10, 20])
+
 
 def calculate_risk_score(
     npv: float,
@@ -14,7 +43,7 @@ def calculate_risk_score(
 ) -> int:
     """
     Расчет количественной оценки риска (risk_score от 0 до 100).
-    
+
     Args:
         npv: Чистая приведенная стоимость, млн руб
         irr: Внутренняя норма доходности, %
@@ -23,72 +52,90 @@ def calculate_risk_score(
         debt_rate: Ставка по долгу, %
         construction_years: Срок строительства, лет
         discount_rate: Ставка дисконтирования, %
-    
+
     Returns:
         Risk score от 0 до 100
     """
-    risk_score = 0
-    
-    # 1. Финансовая устойчивость (вес 40%)
-    if npv < 0:
-        risk_score += 40
-    elif npv < 50:
-        risk_score += 20
-    
-    if irr < discount_rate:
-        risk_score += 30
-    elif irr < discount_rate * 1.1:
-        risk_score += 15
-    
-    if payback_period > 15:
-        risk_score += 30
-    elif payback_period > 10:
-        risk_score += 20
-    
-    # 2. Долговая нагрузка (вес 30%)
-    if debt_share > 70:
-        risk_score += 35
-    elif debt_share > 50:
-        risk_score += 25
-    
-    if debt_rate > 20:
-        risk_score += 30
-    elif debt_rate > 15:
-        risk_score += 20
-    
-    # 3. Временные риски (вес 20%)
-    if construction_years > 7:
-        risk_score += 25
-    elif construction_years > 5:
-        risk_score += 15
-    
-    # 4. Ставка дисконтирования (вес 10%)
-    if discount_rate > 25:
-        risk_score += 20
-    elif discount_rate > 20:
-        risk_score += 10
-    
+    risk_score = (
+        int(_NPV_SCORES[np.searchsorted(_NPV_THRESHOLDS, npv, side='right')])
+        + int(_PAYBACK_SCORES[np.searchsorted(_PAYBACK_THRESHOLDS, payback_period, side='left')])
+        + int(_DEBT_SHARE_SCORES[np.searchsorted(_DEBT_SHARE_THRESHOLDS, debt_share, side='left')])
+        + int(_DEBT_RATE_SCORES[np.searchsorted(_DEBT_RATE_THRESHOLDS, debt_rate, side='left')])
+        + int(_CONSTRUCTION_SCORES[np.searchsorted(_CONSTRUCTION_THRESHOLDS, construction_years, side='left')])
+        + int(_DISCOUNT_SCORES[np.searchsorted(_DISCOUNT_THRESHOLDS, discount_rate, side='left')])
+        # Сравнение IRR со ставкой дисконтирования относительное,
+        # поэтому не табличное: 30 при irr < ставки, 15 в зоне до +10%
+        + 15 * int(irr < discount_rate * 1.1)
+        + 15 * int(irr < discount_rate)
+    )
+
     return min(100, risk_score)
 
 
+def calculate_risk_score_batch(
+    npv,
+    irr,
+    payback_period,
+    debt_share,
+    debt_rate,
+    construction_years,
+    discount_rate
+) -> np.ndarray:
+    """
+    Векторный расчет risk_score сразу для массива проектов.
+
+    Та же формула, что и в calculate_risk_score, но searchsorted и сравнения
+    применяются к целым массивам — один проход numpy вместо N вызовов
+    скалярной функции (например, для сценариев Монте-Карло).
+
+    Args:
+        npv, irr, payback_period, debt_share, debt_rate,
+        construction_years, discount_rate: Массивы одинаковой длины
+
+    Returns:
+        Массив risk_score (0-100) той же длины
+    """
+    irr = np.asarray(irr, dtype=float)
+    discount_rate = np.asarray(discount_rate, dtype=float)
+
+    score = (
+        _NPV_SCORES[np.searchsorted(_NPV_THRESHOLDS, npv, side='right')]
+        + _PAYBACK_SCORES[np.searchsorted(_PAYBACK_THRESHOLDS, payback_period, side='left')]
+        + _DEBT_SHARE_SCORES[np.searchsorted(_DEBT_SHARE_THRESHOLDS, debt_share, side='left')]
+        + _DEBT_RATE_SCORES[np.searchsorted(_DEBT_RATE_THRESHOLDS, debt_rate, side='left')]
+        + _CONSTRUCTION_SCORES[np.searchsorted(_CONSTRUCTION_THRESHOLDS, construction_years, side='left')]
+        + _DISCOUNT_SCORES[np.searchsorted(_DISCOUNT_THRESHOLDS, discount_rate, side='left')]
+        + 15 * (irr < discount_rate * 1.1).astype(int)
+        + 15 * (irr < discount_rate).astype(int)
+    )
+
+    return np.minimum(100, score)
+
+
+# Таблица уровней по score: индексация кортежа вместо цепочки сравнений.
+# Границы те же: 0-30 — Низкий, 31-60 — Средний, 61-85 — Высокий, 86+ — Критический
+_RISK_LEVELS = ("Низкий",) * 31 + ("Средний",) * 30 + ("Высокий",) * 25 + ("Критический",) * 15
+
+# Обоснование для каждого уровня в fallback-режиме
+_RISK_REASONS = {
+    "Низкий": "Проект демонстрирует хорошие финансовые показатели и низкий уровень рисков.",
+    "Средний": "Проект имеет приемлемый уровень рисков, но требует внимательного мониторинга ключевых параметров.",
+    "Высокий": "Проект характеризуется высоким уровнем рисков, необходимы меры по их снижению.",
+    "Критический": "Проект имеет критический уровень рисков, требует пересмотра параметров или отказа от реализации."
+}
+
+
 def score_to_risk_level(risk_score: int) -> Literal["Низкий", "Средний", "Высокий", "Критический"]:
     """
     Преобразование количественного score в уровень риска.
-    
+
     Args:
         risk_score: Количественная оценка риска (0-100)
-    
+
     Returns:
         Уровень риска
     """
-    if risk_score <= 30:
-        return "Низкий"
-    elif risk_score <= 60:
-        return "Средний"
-    elif risk_score <= 85:
-        return "Высокий"
-    else:
-        return "Критический"
+    return _RISK_LEVELS[min(risk_score, 100)]
 
 
 def calculate_risk_fallback(project_data: Dict) -> Dict:
@@ -101,37 +148,40 @@ def calculate_risk_fallback(project_data: Dict) -> Dict:
     Returns:
         Словарь с оценкой рисков в формате, совместимом с API ответом
     """
+    # Параметры читаются из словаря один раз и дальше используются
+    # как локальные — и для расчета score, и для критических факторов
+    npv = project_data.get("npv", 0)
+    irr = project_data.get("irr", 0)
+    payback_period = project_data.get("payback_period", 0)
+    debt_share = project_data.get("debt_share", 0)
+    debt_rate = project_data.get("debt_rate", 0)
+    construction_years = project_data.get("construction_years", 0)
+    discount_rate = project_data.get("discount_rate", 0)
+
     risk_score = calculate_risk_score(
-        npv=project_data.get("npv", 0),
-        irr=project_data.get("irr", 0),
-        payback_period=project_data.get("payback_period", 0),
-        debt_share=project_data.get("debt_share", 0),
-        debt_rate=project_data.get("debt_rate", 0),
-        construction_years=project_data.get("construction_years", 0),
-        discount_rate=project_data.get("discount_rate", 0)
+        npv=npv,
+        irr=irr,
+        payback_period=payback_period,
+        debt_share=debt_share,
+        debt_rate=debt_rate,
+        construction_years=construction_years,
+        discount_rate=discount_rate
     )
     
     risk_level = score_to_risk_level(risk_score)
-    
-    # Формирование обоснования на основе score
-    if risk_level == "Низкий":
-        reason = "Проект демонстрирует хорошие финансовые показатели и низкий уровень рисков."
-    elif risk_level == "Средний":
-        reason = "Проект имеет приемлемый уровень рисков, но требует внимательного мониторинга ключевых параметров."
-    elif risk_level == "Высокий":
-        reason = "Проект характеризуется высоким уровнем рисков, необходимы меры по их снижению."
-    else:
-        reason = "Проект имеет критический уровень рисков, требует пересмотра параметров или отказа от реализации."
+
+    # Формирование обоснования на основе уровня риска
+    reason = _RISK_REASONS[risk_level]
     
     # Определение критических факторов
     critical_factors = []
-    if project_data.get("npv", 0) < 0:
+    if npv < 0:
         critical_factors.append("Отрицательный NPV")
-    if project_data.get("irr", 0) < project_data.get("discount_rate", 0):
+    if irr < discount_rate:
         critical_factors.append("IRR ниже ставки дисконтирования")
-    if project_data.get("debt_share", 0) > 50:
+    if debt_share > 50:
         critical_factors.append("Высокая доля долга")
-    if project_data.get("payback_period", 0) > 10:
+    if payback_period > 10:
         critical_factors.append("Долгий срок окупаемости")
     
     return {
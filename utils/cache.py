@@ -2,11 +2,28 @@
 
 import hashlib
 import json
-import pickle
+import os
+import sqlite3
+import struct
 from pathlib import Path
 from typing import Dict, Optional
 import time
 
+try:
+    import orjson
+
+    def _dumps(obj: Dict) -> bytes:
+        return orjson.dumps(obj)
+
+    def _loads(data: bytes) -> Dict:
+        return orjson.loads(data)
+except ImportError:
+    def _dumps(obj: Dict) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def _loads(data: bytes) -> Dict:
+        return json.loads(data)
+
 from config import Config
 from logger import get_logger
 
@@ -16,18 +33,68 @@ logger = get_logger("cache")
 class AnalysisCache:
     """Класс для кэширования результатов анализа рисков."""
     
-    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: int = 24):
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: int = 24, max_entries: int = 1000):
         """
         Инициализация кэша.
-        
+
         Args:
             cache_dir: Директория для хранения кэша (по умолчанию ./cache)
             ttl_hours: Время жизни кэша в часах (по умолчанию 24 часа)
+            max_entries: Максимальное число записей; при превышении
+                вытесняются наиболее давно использованные (LRU)
         """
         self.cache_dir = cache_dir or Path("./cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.ttl_seconds = ttl_hours * 3600
-        logger.info(f"Кэш инициализирован: {self.cache_dir}, TTL: {ttl_hours} часов")
+        self.max_entries = max_entries
+        # Индекс записей в sqlite: вытеснение по размеру идет через запрос
+        # по первичному ключу, без scandir всей директории на каждую запись
+        self._index_path = self.cache_dir / "index.sqlite"
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, mtime REAL)")
+        except Exception as e:
+            logger.warning(f"Не удалось инициализировать индекс кэша: {e}")
+        logger.info(f"Кэш инициализирован: {self.cache_dir}, TTL: {ttl_hours} часов, лимит: {max_entries} записей")
+
+    def _touch_entry(self, cache_key: str) -> None:
+        """Обновление времени использования записи в индексе (для LRU)."""
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, mtime) VALUES (?, ?)",
+                    (cache_key, time.time())
+                )
+        except Exception as e:
+            logger.warning(f"Ошибка при обновлении индекса кэша: {e}")
+
+    def _forget_entry(self, cache_key: str) -> None:
+        """Удаление записи из индекса (файл уже удален или устарел)."""
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+        except Exception as e:
+            logger.warning(f"Ошибка при удалении из индекса кэша: {e}")
+
+    def _evict_over_limit(self) -> None:
+        """Вытеснение самых давних записей при превышении max_entries."""
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+                if excess <= 0:
+                    return
+                stale = conn.execute(
+                    "SELECT key FROM entries ORDER BY mtime ASC LIMIT ?", (excess,)
+                ).fetchall()
+                for (old_key,) in stale:
+                    try:
+                        os.unlink(self.cache_dir / f"{old_key}.json")
+                    except FileNotFoundError:
+                        pass
+                conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+            logger.info(f"Вытеснено записей кэша по лимиту: {len(stale)}")
+        except Exception as e:
+            logger.warning(f"Ошибка при вытеснении записей кэша: {e}")
     
     def _generate_cache_key(self, project_params: Dict, model_results: Dict) -> str:
         """
@@ -40,27 +107,23 @@ class AnalysisCache:
         Returns:
             Хеш-ключ для кэша
         """
-        # Создаем словарь с нормализованными данными
-        cache_data = {
-            "project_params": {
-                "type": str(project_params.get("type", "")).strip(),
-                "capex": round(float(project_params.get("capex", 0)), 2),
-                "construction_years": round(float(project_params.get("construction_years", 0)), 2),
-                "debt_share": round(float(project_params.get("debt_share", 0)), 2),
-                "debt_rate": round(float(project_params.get("debt_rate", 0)), 2),
-                "discount_rate": round(float(project_params.get("discount_rate", 0)), 2)
-            },
-            "model_results": {
-                "npv": round(float(model_results.get("npv", 0)), 2),
-                "irr": round(float(model_results.get("irr", 0)), 2),
-                "payback_period": round(float(model_results.get("payback_period", 0)), 2)
-            }
-        }
-        
-        # Создаем JSON строку и хеш
-        json_str = json.dumps(cache_data, sort_keys=True, ensure_ascii=False)
-        cache_key = hashlib.sha256(json_str.encode('utf-8')).hexdigest()
-        
+        # Нормализованные числа пакуются компактно через struct вместо сборки
+        # словаря и JSON-сериализации; blake2b — быстрый некриптографический
+        # вариант из stdlib, криптостойкость ключу кэша не нужна
+        payload = struct.pack(
+            '<8d',
+            round(float(project_params.get("capex", 0)), 2),
+            round(float(project_params.get("construction_years", 0)), 2),
+            round(float(project_params.get("debt_share", 0)), 2),
+            round(float(project_params.get("debt_rate", 0)), 2),
+            round(float(project_params.get("discount_rate", 0)), 2),
+            round(float(model_results.get("npv", 0)), 2),
+            round(float(model_results.get("irr", 0)), 2),
+            round(float(model_results.get("payback_period", 0)), 2)
+        ) + str(project_params.get("type", "")).strip().encode('utf-8')
+
+        cache_key = hashlib.blake2b(payload, digest_size=16).hexdigest()
+
         logger.debug(f"Сгенерирован ключ кэша: {cache_key[:16]}...")
         return cache_key
     
@@ -76,27 +139,31 @@ class AnalysisCache:
             Результат анализа из кэша или None
         """
         cache_key = self._generate_cache_key(project_params, model_results)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+
         if not cache_file.exists():
             logger.debug("Кэш не найден")
             return None
-        
+
         try:
             # Проверяем время жизни кэша
             file_age = time.time() - cache_file.stat().st_mtime
             if file_age > self.ttl_seconds:
                 logger.debug(f"Кэш устарел (возраст: {file_age/3600:.1f} часов)")
                 cache_file.unlink()
+                self._forget_entry(cache_key)
                 return None
-            
-            # Загружаем данные из кэша
-            with open(cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
-            
+
+            # Загружаем данные из кэша: результат анализа содержит только
+            # JSON-типы, pickle здесь не нужен (и небезопасен на чужих файлах)
+            cached_data = _loads(cache_file.read_bytes())
+
+            # Обращение продлевает жизнь записи при вытеснении по лимиту
+            self._touch_entry(cache_key)
+
             logger.info(f"Результат загружен из кэша (ключ: {cache_key[:16]}...)")
             return cached_data
-            
+
         except Exception as e:
             logger.warning(f"Ошибка при чтении кэша: {e}")
             # Удаляем поврежденный файл
@@ -104,6 +171,7 @@ class AnalysisCache:
                 cache_file.unlink()
             except:
                 pass
+            self._forget_entry(cache_key)
             return None
     
     def set(self, project_params: Dict, model_results: Dict, analysis_result: Dict) -> None:
@@ -116,12 +184,18 @@ class AnalysisCache:
             analysis_result: Результат анализа рисков
         """
         cache_key = self._generate_cache_key(project_params, model_results)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
-        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(analysis_result, f)
-            
+            # Атомарная запись: сначала во временный файл, затем os.replace —
+            # оборванная запись не оставит в кэше поврежденный файл
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_bytes(_dumps(analysis_result))
+            os.replace(tmp_file, cache_file)
+
+            self._touch_entry(cache_key)
+            self._evict_over_limit()
+
             logger.info(f"Результат сохранен в кэш (ключ: {cache_key[:16]}...)")
             
         except Exception as e:
@@ -141,11 +215,21 @@ class AnalysisCache:
         current_time = time.time()
         
         try:
-            for cache_file in self.cache_dir.glob("*.pkl"):
-                file_age = current_time - cache_file.stat().st_mtime
-                if file_age > self.ttl_seconds:
-                    cache_file.unlink()
-                    deleted_count += 1
+            # os.scandir отдает метаданные через DirEntry без отдельного
+            # системного вызова stat на каждый файл, в отличие от glob + stat
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    # Вычищаются и старые pickle-файлы от прежнего формата кэша
+                    if not entry.name.endswith(('.json', '.pkl')) or not entry.is_file():
+                        continue
+                    file_age = current_time - entry.stat().st_mtime
+                    if file_age > self.ttl_seconds:
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            continue
+                        self._forget_entry(entry.name.rsplit('.', 1)[0])
+                        deleted_count += 1
             
             if deleted_count > 0:
                 logger.info(f"Очищено устаревших записей кэша: {deleted_count}")
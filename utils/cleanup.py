@@ -1,6 +1,8 @@
 """Утилиты для очистки временных файлов."""
 
+import asyncio
 import os
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -53,17 +55,29 @@ def cleanup_old_files(max_age_minutes: int = 5) -> int:
     deleted_count = 0
     
     try:
-        for file_path in Config.TEMP_FILE_PATH.iterdir():
-            if file_path.is_file():
-                file_age = current_time - file_path.stat().st_mtime
-                
+        # os.scandir: метаданные приходят вместе с элементом каталога,
+        # без отдельного stat на каждый файл
+        with os.scandir(Config.TEMP_FILE_PATH) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                file_age = current_time - entry.stat().st_mtime
+
                 if file_age > max_age_seconds:
-                    if remove_file(file_path):
-                        deleted_count += 1
-                        logger.info(f"Удален устаревший файл: {file_path.name} (возраст: {file_age/60:.1f} мин)")
-        
+                    # unlink сам сообщит об отсутствии файла — отдельная
+                    # проверка exists() была бы лишним syscall
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        continue
+                    except OSError as e:
+                        logger.error(f"Ошибка при удалении файла {entry.name}: {e}")
+                        continue
+                    deleted_count += 1
+
+        # Итоговая запись в лог один раз, а не на каждый удаленный файл
         if deleted_count > 0:
-            logger.info(f"Очищено временных файлов: {deleted_count}")
+            logger.info(f"Очищено устаревших временных файлов: {deleted_count}")
         
         return deleted_count
         
@@ -72,21 +86,41 @@ def cleanup_old_files(max_age_minutes: int = 5) -> int:
         return deleted_count
 
 
-def cleanup_file_after_processing(file_path: Optional[Path], delay_seconds: int = 0) -> None:
+async def cleanup_file_after_processing(file_path: Optional[Path], delay_seconds: int = 0) -> None:
     """
     Удаление файла после обработки с возможной задержкой.
-    
+
+    Задержка отрабатывается через asyncio.sleep, а сам unlink уходит в пул
+    потоков — обработчик бота не блокируется ни на ожидании, ни на syscall.
+
     Args:
         file_path: Путь к файлу для удаления
         delay_seconds: Задержка перед удалением в секундах
     """
     if file_path is None:
         return
-    
+
     if delay_seconds > 0:
-        time.sleep(delay_seconds)
-    
-    remove_file(file_path)
+        await asyncio.sleep(delay_seconds)
+
+    await asyncio.to_thread(remove_file, file_path)
+
+
+def schedule_cleanup(file_path: Optional[Path], delay_seconds: int = 0) -> None:
+    """
+    Отложенное удаление файла для синхронных вызовов: таймер запускает
+    удаление в фоновом потоке, вызывающий код возвращается сразу.
+
+    Args:
+        file_path: Путь к файлу для удаления
+        delay_seconds: Задержка перед удалением в секундах
+    """
+    if file_path is None:
+        return
+
+    timer = threading.Timer(delay_seconds, remove_file, args=(file_path,))
+    timer.daemon = True
+    timer.start()
 
 
 def cleanup_all_temp_files() -> int:
@@ -102,11 +136,17 @@ def cleanup_all_temp_files() -> int:
     deleted_count = 0
     
     try:
-        for file_path in Config.TEMP_FILE_PATH.iterdir():
-            if file_path.is_file():
-                if remove_file(file_path):
-                    deleted_count += 1
-        
+        with os.scandir(Config.TEMP_FILE_PATH) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    try:
+                        os.unlink(entry.path)
+                        deleted_count += 1
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.error(f"Ошибка при удалении файла {entry.name}: {e}")
+
         logger.info(f"Удалено всех временных файлов: {deleted_count}")
         return deleted_count
         